@@ -1,11 +1,20 @@
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
+from django.utils import timezone
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from content.constants import MAX_FILE_SIZE_MB
 from content.models import Category, ContentFile, Path, Topic
-from tg_bot.models import BotMessage
+from tg_bot.models import BotMessage, Broadcast
+from tg_stat_bot.constants import (
+    TIMESERIES_DEFAULT_DAYS,
+    TIMESERIES_GRANULARITIES,
+    TIMESERIES_MAX_DAYS,
+    TIMESERIES_METRICS
+)
 
 
 User = get_user_model()
@@ -170,6 +179,8 @@ class ContentFileSerializer(serializers.ModelSerializer):
         topics = validated_data.pop('topics', None)
         paths = validated_data.pop('paths', None)
 
+        if 'file' in validated_data:
+            instance.reset_telegram_file()
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
@@ -244,3 +255,70 @@ class BotMessageSerializer(serializers.ModelSerializer):
         model = BotMessage
         fields = ['id', 'key', 'text', 'comment', 'updated_at']
         read_only_fields = ['id', 'key', 'updated_at']
+
+
+class BroadcastSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Broadcast
+        fields = [
+            'id',
+            'text',
+            'status',
+            'total',
+            'sent',
+            'blocked',
+            'failed',
+            'unknown',
+            'progress',
+            'created_at',
+            'started_at',
+            'finished_at',
+        ]
+        read_only_fields = [
+            field for field in fields if field != 'text'
+        ]
+
+    def get_progress(self, obj):
+        """Share of processed recipients, from 0 to 1."""
+        if not obj.total:
+            return 1.0 if obj.status == Broadcast.Status.DONE else 0.0
+        return obj.processed / obj.total
+
+
+class StatisticsTimeseriesSerializer(serializers.Serializer):
+    """Query parameters of the statistics time series."""
+
+    metric = serializers.ChoiceField(choices=TIMESERIES_METRICS)
+    from_ = serializers.DateField(required=False)
+    to = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(
+        choices=TIMESERIES_GRANULARITIES,
+        default='day'
+    )
+    content = serializers.IntegerField(min_value=1, required=False)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        fields['from'] = fields.pop('from_')
+        return fields
+
+    def validate(self, data):
+        data.setdefault('to', timezone.localdate())
+        data.setdefault(
+            'from', data['to'] - timedelta(days=TIMESERIES_DEFAULT_DAYS - 1)
+        )
+        if data['from'] > data['to']:
+            raise serializers.ValidationError(
+                {'from': 'Начало периода позже его конца'}
+            )
+        if (data['to'] - data['from']).days >= TIMESERIES_MAX_DAYS:
+            raise serializers.ValidationError(
+                {'from': f'Период не длиннее {TIMESERIES_MAX_DAYS} дней'}
+            )
+        if data['metric'] == 'new_users' and 'content' in data:
+            raise serializers.ValidationError(
+                {'content': 'Новые пользователи не считаются по файлам'}
+            )
+        return data
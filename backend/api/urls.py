@@ -5,11 +5,14 @@ from rest_framework_simplejwt.views import TokenVerifyView
 
 from api.views import (
     BotMessageViewSet,
+    BroadcastViewSet,
     CategoryViewSet,
     ContentFileViewSet,
+    DatabasePoolAPIView,
     PathViewSet,
     TopicViewSet,
     StatisticsAPIView,
+    StatisticsTimeseriesAPIView,
     CookieTokenObtainPairView,
     CookieTokenRefreshView,
 )
@@ -21,6 +24,7 @@ router.register(r'categories', CategoryViewSet)
 router.register(r'topics', TopicViewSet)
 router.register(r'files', ContentFileViewSet)
 router.register(r'botmessages', BotMessageViewSet)
+router.register(r'broadcasts', BroadcastViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -35,6 +39,12 @@ urlpatterns = [
     path('auth/', include('djoser.urls')),
     path('schema/', SpectacularAPIView.as_view(), name='schema'),
     path('statistics/', StatisticsAPIView.as_view(), name='statistics'),
+    path(
+        'statistics/timeseries/',
+        StatisticsTimeseriesAPIView.as_view(),
+        name='statistics-timeseries'
+    ),
+    path('health/db/', DatabasePoolAPIView.as_view(), name='health-db'),
     path(
         'docs/',
         SpectacularSwaggerView.as_view(url_name='schema'),
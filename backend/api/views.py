@@ -1,22 +1,29 @@
 from datetime import timedelta
-from rest_framework import viewsets, status
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
 from api.serializers import (
     BotMessageSerializer,
+    BroadcastSerializer,
     CategorySerializer,
     ContentFileSerializer,
     PathSerializer,
+    StatisticsTimeseriesSerializer,
     TopicSerializer,
     CustomTokenObtainPairSerializer,
 )
 from content.models import Category, ContentFile, Topic, Path
-from tg_bot.models import BotMessage
-from tg_stat_bot.utils import get_all_metrics
+from tg_bot.db import get_pool_stats
+from tg_bot.models import BotMessage, Broadcast
+from tg_stat_bot.utils import get_timeseries, metrics_snapshot
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -46,10 +53,77 @@ class BotMessageViewSet(viewsets.ModelViewSet):
     lookup_field = 'key'
 
 
+class BroadcastViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    viewsets.GenericViewSet
+):
+    """Announcements to all bot users and their delivery progress."""
+    queryset = Broadcast.objects.all()
+    serializer_class = BroadcastSerializer
+    permission_classes = (IsAdminUser,)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        broadcast = self.get_object()
+        Broadcast.objects.filter(
+            pk=broadcast.pk,
+            status__in=[Broadcast.Status.PENDING, Broadcast.Status.RUNNING]
+        ).update(status=Broadcast.Status.CANCELLED)
+        broadcast.refresh_from_db()
+        return Response(self.get_serializer(broadcast).data)
+
+
 class StatisticsAPIView(APIView):
+    """Cached metrics snapshot; answers 304 to conditional requests."""
+
+    def get(self, request):
+        stats, computed_at, etag = metrics_snapshot.get()
+        last_modified = int(computed_at.timestamp())
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified
+        ) or Response(stats)
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class StatisticsTimeseriesAPIView(APIView):
+    """A metric per day, week or month over a date range."""
+
+    def get(self, request):
+        serializer = StatisticsTimeseriesSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response({
+            'metric': params['metric'],
+            'granularity': params['granularity'],
+            'from': params['from'],
+            'to': params['to'],
+            'content': params.get('content'),
+            'points': get_timeseries(
+                params['metric'],
+                params['from'],
+                params['to'],
+                params['granularity'],
+                params.get('content')
+            ),
+        })
+
+
+class DatabasePoolAPIView(APIView):
+    """Connection pool counters of the worker serving the request."""
+    permission_classes = (IsAdminUser,)
+
     def get(self, request):
-        stats = get_all_metrics()
-        return Response(stats)
+        return Response({
+            'role': settings.PROCESS_ROLE,
+            'pool': get_pool_stats(),
+        })
 
 
 class CookieTokenObtainPairView(TokenObtainPairView):
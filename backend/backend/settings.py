@@ -18,6 +18,29 @@ TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN','')
 
 TELEGRAM_ADMIN_BOT_TOKEN = os.getenv('TELEGRAM_ADMIN_BOT_TOKEN','')
 
+TELEGRAM_STORAGE_CHAT_ID = os.getenv('TELEGRAM_STORAGE_CHAT_ID', '')
+
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', '')
+
+TELEGRAM_WEBHOOK_URL = os.getenv('TELEGRAM_WEBHOOK_URL', '')
+
+TELEGRAM_WEBHOOK_PATH = os.getenv('TELEGRAM_WEBHOOK_PATH', '/tg/webhook')
+
+TELEGRAM_WEBHOOK_SECRET = os.getenv('TELEGRAM_WEBHOOK_SECRET', '')
+
+BOT_DB_THREADS = int(os.getenv('BOT_DB_THREADS', 8))
+
+BOT_DB_TIMEOUT = float(os.getenv('BOT_DB_TIMEOUT', 10))
+
+# Seconds a computed statistics snapshot is served before recomputing.
+STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', 300))
+
+# Monthly content view partitions created in advance of the current month.
+VIEW_PARTITIONS_AHEAD = int(os.getenv('VIEW_PARTITIONS_AHEAD', 3))
+
+# api, bot or statbot: each role gets its own connection pool size.
+PROCESS_ROLE = os.getenv('PROCESS_ROLE', 'api')
+
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost, 127.0.0.1').split(',')
 
 CSRF_TRUSTED_ORIGINS = os.getenv('CSRF_TRUSTED_ORIGINS','http://localhost').split(',')
@@ -29,6 +52,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'drf_spectacular',
@@ -113,9 +137,41 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'postgres'),
         'PORT': os.getenv('DB_PORT', 5432),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+DB_POOL_SIZES = {
+    'api': (2, 4),
+    'bot': (2, BOT_DB_THREADS),
+    'statbot': (1, 2),
+}
+
+DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE = (
+    int(os.getenv(name, default)) for name, default in zip(
+        ('DB_POOL_MIN_SIZE', 'DB_POOL_MAX_SIZE'),
+        DB_POOL_SIZES.get(PROCESS_ROLE, DB_POOL_SIZES['api'])
+    )
+)
+
+DATABASES['default']['OPTIONS'] = {}
+
+if os.getenv('DB_POOL_ENABLED', 'True') == 'True':
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'name': PROCESS_ROLE,
+        'min_size': DB_POOL_MIN_SIZE,
+        'max_size': DB_POOL_MAX_SIZE,
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 600)),
+    }
+
+# A bot call that times out only stops being awaited, so the server
+# cancels its query after the same BOT_DB_TIMEOUT.
+if PROCESS_ROLE in ('bot', 'statbot'):
+    DATABASES['default']['OPTIONS']['options'] = (
+        f'-c statement_timeout={int(BOT_DB_TIMEOUT * 1000)}'
+    )
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
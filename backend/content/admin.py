@@ -52,6 +52,7 @@ class ContentFileAdmin(admin.ModelAdmin):
     list_editable = ['is_active']
     search_fields = ['name']
     filter_horizontal = ['categories', 'paths', 'topics']
+    readonly_fields = ['telegram_file_id', 'telegram_file_unique_id']
     ordering = ['name']
 
     def get_queryset(self, request):
@@ -60,6 +61,11 @@ class ContentFileAdmin(admin.ModelAdmin):
             request
         ).annotate_rating().prefetch_related('categories', 'topics')
 
+    def save_model(self, request, obj, form, change):
+        if change and 'file' in form.changed_data:
+            obj.reset_telegram_file()
+        super().save_model(request, obj, form, change)
+
     def rating(self, obj):
         return obj.rating
 
@@ -3,6 +3,13 @@ MAX_SLUG_CHARS = 20
 MAX_FILENAME_CHARS = 100
 MAX_DESCRIPTION_CHARS = 1000
 MAX_FILE_SIZE_MB = 50
+MAX_TELEGRAM_ID_CHARS = 255
+MAX_FILE_HASH_CHARS = 64
+
+SEARCH_CONFIG = 'russian'
+SEARCH_RESULTS_LIMIT = 50
+
+HLL_PRECISION = 12  # 4 KB sketches, ~1.6% standard error
 
 MIN_RATING_INT = 1
 MAX_RATING_INT = 5
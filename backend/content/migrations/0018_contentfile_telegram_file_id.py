@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0017_contentfile_external_url_alter_contentfile_file_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentfile',
+            name='telegram_file_id',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Telegram file ID'),
+        ),
+        migrations.AddField(
+            model_name='contentfile',
+            name='telegram_file_unique_id',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Telegram file unique ID'),
+        ),
+    ]
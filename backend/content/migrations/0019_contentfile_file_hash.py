@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0018_contentfile_telegram_file_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contentfile',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64, verbose_name='File SHA-256'),
+        ),
+    ]
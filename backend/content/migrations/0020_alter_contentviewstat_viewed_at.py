@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0019_contentfile_file_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contentviewstat',
+            name='viewed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='viewing time'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:12
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+FILL_SEARCH_VECTOR_SQL = """
+UPDATE content_contentfile AS f SET search_vector =
+    setweight(to_tsvector('russian', coalesce(f.name, '')), 'A')
+    || setweight(to_tsvector('russian', coalesce(f.description, '')), 'B')
+    || setweight(to_tsvector('russian', coalesce((
+        SELECT string_agg(t.name, ' ')
+        FROM content_topic AS t
+        JOIN content_contentfile_topics AS ft ON ft.topic_id = t.id
+        WHERE ft.contentfile_id = f.id
+    ), '')), 'C')
+    || setweight(to_tsvector('russian', coalesce((
+        SELECT string_agg(c.name, ' ')
+        FROM content_category AS c
+        JOIN content_contentfile_categories AS fc ON fc.category_id = c.id
+        WHERE fc.contentfile_id = f.id
+    ), '')), 'D');
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0020_alter_contentviewstat_viewed_at'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='contentfile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='contentfile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='content_file_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contentfile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='content_file_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(FILL_SEARCH_VECTOR_SQL, migrations.RunSQL.noop),
+    ]
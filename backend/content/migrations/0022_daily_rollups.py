@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0021_contentfile_search_vector'),
+        ('users', '0005_botuser_activity_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyNewUsers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='day')),
+                ('users', models.PositiveIntegerField(default=0, verbose_name='new users')),
+            ],
+            options={
+                'verbose_name': 'daily new users',
+                'verbose_name_plural': 'Daily new users',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyActiveUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='active_days', to='users.botuser', verbose_name='bot user')),
+            ],
+            options={
+                'verbose_name': 'daily active user',
+                'verbose_name_plural': 'Daily active users',
+                'constraints': [models.UniqueConstraint(fields=('day', 'user'), name='unique_daily_active_user')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyContentViews',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='views')),
+                ('content_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_views', to='content.contentfile', verbose_name='file')),
+            ],
+            options={
+                'verbose_name': 'daily content views',
+                'verbose_name_plural': 'Daily content views',
+                'constraints': [models.UniqueConstraint(fields=('day', 'content_file'), name='unique_daily_content_views')],
+            },
+        ),
+    ]
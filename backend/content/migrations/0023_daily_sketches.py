@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0022_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyUserSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True, verbose_name='day')),
+                ('sketch', models.BinaryField(verbose_name='sketch')),
+            ],
+            options={
+                'verbose_name': 'daily user sketch',
+                'verbose_name_plural': 'Daily user sketches',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyContentSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('sketch', models.BinaryField(verbose_name='sketch')),
+                ('content_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sketches', to='content.contentfile', verbose_name='file')),
+            ],
+            options={
+                'verbose_name': 'daily content sketch',
+                'verbose_name_plural': 'Daily content sketches',
+                'constraints': [models.UniqueConstraint(fields=('day', 'content_file'), name='unique_daily_content_sketch')],
+            },
+        ),
+    ]
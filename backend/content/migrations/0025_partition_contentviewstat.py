@@ -0,0 +1,127 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:31
+
+from datetime import timezone as dt_timezone
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.db import migrations, models
+
+from content.partitions import create_view_partitions
+
+
+CREATE_SQL = """
+ALTER TABLE content_contentviewstat RENAME TO content_contentviewstat_old;
+CREATE SEQUENCE content_contentviewstat_id_part_seq;
+CREATE TABLE content_contentviewstat (
+    id bigint NOT NULL DEFAULT nextval('content_contentviewstat_id_part_seq'),
+    viewed_at timestamp with time zone NOT NULL,
+    content_file_id bigint NOT NULL
+        REFERENCES content_contentfile (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id bigint NOT NULL
+        REFERENCES users_botuser (id) DEFERRABLE INITIALLY DEFERRED,
+    CONSTRAINT content_contentviewstat_part_pkey PRIMARY KEY (id, viewed_at)
+) PARTITION BY RANGE (viewed_at);
+ALTER SEQUENCE content_contentviewstat_id_part_seq
+    OWNED BY content_contentviewstat.id;
+"""
+
+COPY_SQL = """
+INSERT INTO content_contentviewstat (id, viewed_at, content_file_id, user_id)
+    SELECT id, viewed_at, content_file_id, user_id
+    FROM content_contentviewstat_old;
+SELECT setval(
+    'content_contentviewstat_id_part_seq', coalesce(max(id), 0) + 1, false
+) FROM content_contentviewstat;
+DROP TABLE content_contentviewstat_old;
+CREATE INDEX content_con_content_47ab89_idx
+    ON content_contentviewstat (content_file_id, viewed_at);
+CREATE INDEX content_view_viewed_at_brin
+    ON content_contentviewstat USING brin (viewed_at);
+"""
+
+UNPARTITION_SQL = """
+ALTER TABLE content_contentviewstat RENAME TO content_contentviewstat_part;
+ALTER INDEX content_con_content_47ab89_idx
+    RENAME TO content_con_content_47ab89_part_idx;
+CREATE TABLE content_contentviewstat (
+    id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    viewed_at timestamp with time zone NOT NULL,
+    content_file_id bigint NOT NULL
+        REFERENCES content_contentfile (id) DEFERRABLE INITIALLY DEFERRED,
+    user_id bigint NOT NULL
+        REFERENCES users_botuser (id) DEFERRABLE INITIALLY DEFERRED
+);
+INSERT INTO content_contentviewstat (id, viewed_at, content_file_id, user_id)
+    SELECT id, viewed_at, content_file_id, user_id
+    FROM content_contentviewstat_part;
+SELECT setval(
+    pg_get_serial_sequence('content_contentviewstat', 'id'),
+    coalesce(max(id), 0) + 1,
+    false
+) FROM content_contentviewstat;
+DROP TABLE content_contentviewstat_part;
+CREATE INDEX content_contentviewstat_content_file_id
+    ON content_contentviewstat (content_file_id);
+CREATE INDEX content_contentviewstat_user_id
+    ON content_contentviewstat (user_id);
+CREATE INDEX content_con_user_id_6c6a50_idx
+    ON content_contentviewstat (user_id, viewed_at);
+CREATE INDEX content_con_content_47ab89_idx
+    ON content_contentviewstat (content_file_id, viewed_at);
+ALTER TABLE content_contentviewstat ADD CONSTRAINT unique_user_content_view
+    UNIQUE (user_id, content_file_id, viewed_at);
+"""
+
+
+def create_partitions(apps, schema_editor):
+    """Monthly partitions from the first stored view up to months ahead."""
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('SELECT min(viewed_at) FROM content_contentviewstat_old')
+        first_view, = cursor.fetchone()
+    create_view_partitions(
+        start=first_view and first_view.astimezone(dt_timezone.utc).date()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0024_statisticssnapshot'),
+        ('users', '0005_botuser_activity_index'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(CREATE_SQL, UNPARTITION_SQL),
+                migrations.RunPython(
+                    create_partitions, migrations.RunPython.noop
+                ),
+                migrations.RunSQL(COPY_SQL, migrations.RunSQL.noop),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name='contentviewstat',
+                    name='unique_user_content_view',
+                ),
+                migrations.RemoveIndex(
+                    model_name='contentviewstat',
+                    name='content_con_user_id_6c6a50_idx',
+                ),
+                migrations.AlterField(
+                    model_name='contentviewstat',
+                    name='content_file',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='view_stats', to='content.contentfile', verbose_name='file'),
+                ),
+                migrations.AlterField(
+                    model_name='contentviewstat',
+                    name='user',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='content_views', to='users.botuser', verbose_name='bot user'),
+                ),
+                migrations.AddIndex(
+                    model_name='contentviewstat',
+                    index=django.contrib.postgres.indexes.BrinIndex(fields=['viewed_at'], name='content_view_viewed_at_brin'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0025_partition_contentviewstat'),
+        ('users', '0005_botuser_activity_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyContentUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='day')),
+                ('content_file', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_users', to='content.contentfile', verbose_name='file')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='content_days', to='users.botuser', verbose_name='bot user')),
+            ],
+            options={
+                'verbose_name': 'daily content user',
+                'verbose_name_plural': 'Daily content users',
+                'constraints': [models.UniqueConstraint(fields=('content_file', 'day', 'user'), name='unique_daily_content_user')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0026_dailycontentuser'),
+        ('users', '0005_botuser_activity_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contentviewstat',
+            index=models.Index(fields=['user'], name='content_view_user_idx'),
+        ),
+    ]
@@ -1,17 +1,31 @@
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.indexes import BrinIndex, GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity
+)
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.text import slugify, Truncator
 
 from content.constants import (
     MAX_DESCRIPTION_CHARS,
+    MAX_FILE_HASH_CHARS,
     MAX_FILENAME_CHARS,
     MAX_NAME_CHARS,
     MAX_OBJECT_CHARS,
     MAX_SLUG_CHARS,
     MAX_RATING_INT,
+    MAX_TELEGRAM_ID_CHARS,
     MIN_RATING_INT,
-    RATING_VALIDATION_ERROR
+    RATING_VALIDATION_ERROR,
+    SEARCH_CONFIG
 )
 from users.models import BotUser
 
@@ -86,6 +100,51 @@ class ContentFileQuerySet(models.query.QuerySet):
             rating_count=models.Count('ratings')
         )
 
+    def search(self, text: str):
+        """Files matching a text query, best matches first.
+
+        Full-text matches over the search vector are ranked first, names
+        similar to the query (typos) follow.
+        """
+        query = SearchQuery(
+            text,
+            config=SEARCH_CONFIG,
+            search_type='websearch'
+        )
+        return self.filter(
+            models.Q(search_vector=query)
+            | models.Q(name__trigram_similar=text)
+        ).annotate(
+            rank=SearchRank(models.F('search_vector'), query),
+            similarity=TrigramSimilarity('name', text)
+        ).order_by('-rank', '-similarity', 'name')
+
+    def update_search_vector(self):
+        """Rebuild the search vector of the files in the queryset."""
+        def section_names(model):
+            return Coalesce(
+                models.Subquery(
+                    model.objects.filter(
+                        files=models.OuterRef('pk')
+                    ).values('files').annotate(
+                        names=StringAgg('name', ' ')
+                    ).values('names')
+                ),
+                models.Value(''),
+                output_field=models.TextField()
+            )
+
+        return self.update(search_vector=(
+            SearchVector('name', weight='A', config=SEARCH_CONFIG)
+            + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+            + SearchVector(
+                section_names(Topic), weight='C', config=SEARCH_CONFIG
+            )
+            + SearchVector(
+                section_names(Category), weight='D', config=SEARCH_CONFIG
+            )
+        ))
+
 
 class ContentFile(models.Model):
     """Content unit (file)."""
@@ -131,6 +190,23 @@ class ContentFile(models.Model):
     topics = models.ManyToManyField(Topic, verbose_name='Topics', blank=True)
     is_active = models.BooleanField('Active', default=False)
     created_at = models.DateTimeField('Created', auto_now_add=True)
+    telegram_file_id = models.CharField(
+        'Telegram file ID',
+        max_length=MAX_TELEGRAM_ID_CHARS,
+        blank=True
+    )
+    telegram_file_unique_id = models.CharField(
+        'Telegram file unique ID',
+        max_length=MAX_TELEGRAM_ID_CHARS,
+        blank=True
+    )
+    file_hash = models.CharField(
+        'File SHA-256',
+        max_length=MAX_FILE_HASH_CHARS,
+        blank=True,
+        db_index=True
+    )
+    search_vector = SearchVectorField(null=True, editable=False)
     objects = ContentFileQuerySet.as_manager()
 
     def clean(self):
@@ -148,10 +224,24 @@ class ContentFile(models.Model):
         verbose_name = 'file'
         verbose_name_plural = 'Files'
         ordering = ['name', 'file_type']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='content_file_search_idx'),
+            GinIndex(
+                fields=['name'],
+                opclasses=['gin_trgm_ops'],
+                name='content_file_name_trgm_idx'
+            ),
+        ]
 
     def __str__(self):
         return Truncator(self.name).chars(MAX_OBJECT_CHARS)
 
+    def reset_telegram_file(self):
+        """Forget the uploaded Telegram copy after the file was replaced."""
+        self.telegram_file_id = ''
+        self.telegram_file_unique_id = ''
+        self.file_hash = ''
+
 
 class ContentRating(models.Model):
     """User rating for content."""
@@ -193,23 +283,29 @@ class ContentRating(models.Model):
 
 
 class ContentViewStat(models.Model):
-    """User viewing statistics."""
+    """User viewing statistics.
+
+    The table is partitioned by viewed_at month (see content.partitions);
+    its primary key in the database is (id, viewed_at).
+    """
 
     user = models.ForeignKey(
         BotUser,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='bot user',
         related_name='content_views'
     )
     content_file = models.ForeignKey(
         ContentFile,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='file',
         related_name='view_stats'
     )
     viewed_at = models.DateTimeField(
         'viewing time',
-        auto_now_add=True
+        default=timezone.now
     )
 
     class Meta:
@@ -217,15 +313,165 @@ class ContentViewStat(models.Model):
         verbose_name_plural = 'Viewing statistics'
         ordering = ['-viewed_at']
         indexes = [
-            models.Index(fields=['user', 'viewed_at']),
             models.Index(fields=['content_file', 'viewed_at']),
+            models.Index(fields=['user'], name='content_view_user_idx'),
+            BrinIndex(
+                fields=['viewed_at'],
+                name='content_view_viewed_at_brin'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.content_file} - {self.viewed_at}'
+
+
+class DailyActiveUser(models.Model):
+    """Rollup: users who viewed content on a day."""
+
+    day = models.DateField('day')
+    user = models.ForeignKey(
+        BotUser,
+        on_delete=models.CASCADE,
+        verbose_name='bot user',
+        related_name='active_days'
+    )
+
+    class Meta:
+        verbose_name = 'daily active user'
+        verbose_name_plural = 'Daily active users'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'user'],
+                name='unique_daily_active_user'
+            )
         ]
+
+    def __str__(self):
+        return f'{self.day} - {self.user}'
+
+
+class DailyContentUser(models.Model):
+    """Rollup: users who viewed a file on a day."""
+
+    day = models.DateField('day')
+    content_file = models.ForeignKey(
+        ContentFile,
+        on_delete=models.CASCADE,
+        verbose_name='file',
+        related_name='daily_users'
+    )
+    user = models.ForeignKey(
+        BotUser,
+        on_delete=models.CASCADE,
+        verbose_name='bot user',
+        related_name='content_days'
+    )
+
+    class Meta:
+        verbose_name = 'daily content user'
+        verbose_name_plural = 'Daily content users'
         constraints = [
             models.UniqueConstraint(
-                fields=['user', 'content_file', 'viewed_at'],
-                name='unique_user_content_view'
+                fields=['content_file', 'day', 'user'],
+                name='unique_daily_content_user'
             )
         ]
 
     def __str__(self):
-        return f'{self.user} - {self.content_file} - {self.viewed_at}'
+        return f'{self.day} - {self.content_file} - {self.user}'
+
+
+class DailyContentViews(models.Model):
+    """Rollup: number of views of a file on a day."""
+
+    day = models.DateField('day')
+    content_file = models.ForeignKey(
+        ContentFile,
+        on_delete=models.CASCADE,
+        verbose_name='file',
+        related_name='daily_views'
+    )
+    views = models.PositiveIntegerField('views', default=0)
+
+    class Meta:
+        verbose_name = 'daily content views'
+        verbose_name_plural = 'Daily content views'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'content_file'],
+                name='unique_daily_content_views'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.day} - {self.content_file}: {self.views}'
+
+
+class DailyNewUsers(models.Model):
+    """Rollup: number of bot users who signed up on a day."""
+
+    day = models.DateField('day', unique=True)
+    users = models.PositiveIntegerField('new users', default=0)
+
+    class Meta:
+        verbose_name = 'daily new users'
+        verbose_name_plural = 'Daily new users'
+        ordering = ['-day']
+
+    def __str__(self):
+        return f'{self.day}: {self.users}'
+
+
+class DailyUserSketch(models.Model):
+    """HyperLogLog sketch of the users who viewed content on a day."""
+
+    day = models.DateField('day', unique=True)
+    sketch = models.BinaryField('sketch')
+
+    class Meta:
+        verbose_name = 'daily user sketch'
+        verbose_name_plural = 'Daily user sketches'
+
+    def __str__(self):
+        return str(self.day)
+
+
+class DailyContentSketch(models.Model):
+    """HyperLogLog sketch of the users who viewed a file on a day."""
+
+    day = models.DateField('day')
+    content_file = models.ForeignKey(
+        ContentFile,
+        on_delete=models.CASCADE,
+        verbose_name='file',
+        related_name='daily_sketches'
+    )
+    sketch = models.BinaryField('sketch')
+
+    class Meta:
+        verbose_name = 'daily content sketch'
+        verbose_name_plural = 'Daily content sketches'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'content_file'],
+                name='unique_daily_content_sketch'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.day} - {self.content_file}'
+
+
+class StatisticsSnapshot(models.Model):
+    """Computed statistics payload shared by the API and the stat bot."""
+
+    key = models.CharField('key', max_length=50, unique=True)
+    data = models.JSONField('data', default=dict)
+    computed_at = models.DateTimeField('computed at')
+
+    class Meta:
+        verbose_name = 'statistics snapshot'
+        verbose_name_plural = 'Statistics snapshots'
+
+    def __str__(self):
+        return f'{self.key} ({self.computed_at})'
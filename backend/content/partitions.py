@@ -0,0 +1,108 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection
+
+from content.models import ContentViewStat
+
+
+VIEW_TABLE = ContentViewStat._meta.db_table
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    return f'{VIEW_TABLE}_{month:%Y_%m}'
+
+
+def get_month_bound(month: date) -> str:
+    """Partition bound literal: the month start in UTC."""
+    return datetime(
+        month.year, month.month, 1, tzinfo=dt_timezone.utc
+    ).isoformat()
+
+
+def get_view_partitions() -> list[dict]:
+    """Partitions of the views table with row estimates and sizes."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), '
+            'c.reltuples::bigint, pg_table_size(c.oid), '
+            'pg_indexes_size(c.oid) '
+            'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = %s::regclass ORDER BY c.relname',
+            [VIEW_TABLE]
+        )
+        return [
+            {
+                'name': name,
+                'bound': bound,
+                'rows': max(rows, 0),
+                'table_size': table_size,
+                'index_size': index_size,
+            }
+            for name, bound, rows, table_size, index_size in cursor.fetchall()
+        ]
+
+
+def create_view_partitions(
+    months_ahead: int = None,
+    start: date = None
+) -> list[str]:
+    """Create the monthly partitions from start up to months_ahead.
+
+    start defaults to the current month, months_ahead to the
+    VIEW_PARTITIONS_AHEAD setting. Returns the created names. There is
+    no DEFAULT partition: a view for a month without one fails to insert
+    instead of piling up where no later partition can go.
+    """
+    if months_ahead is None:
+        months_ahead = settings.VIEW_PARTITIONS_AHEAD
+    today = datetime.now(dt_timezone.utc).date()
+    month = (start or today).replace(day=1)
+    last = add_months(today.replace(day=1), months_ahead)
+    existing = {partition['name'] for partition in get_view_partitions()}
+    created = []
+    with connection.cursor() as cursor:
+        while month <= last:
+            name = get_partition_name(month)
+            if name not in existing:
+                cursor.execute(
+                    f'CREATE TABLE {connection.ops.quote_name(name)} '
+                    f'PARTITION OF {connection.ops.quote_name(VIEW_TABLE)} '
+                    f"FOR VALUES FROM ('{get_month_bound(month)}') "
+                    f"TO ('{get_month_bound(add_months(month, 1))}')"
+                )
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+def detach_view_partitions(before: date, drop: bool = False) -> list[str]:
+    """Detach (and optionally drop) the monthly partitions before a month.
+
+    Detaching only changes the catalog, so it takes the same time
+    whatever the partition size. Daily rollups are kept.
+    """
+    first_kept = get_partition_name(before.replace(day=1))
+    prefix = f'{VIEW_TABLE}_'
+    detached = []
+    with connection.cursor() as cursor:
+        for partition in get_view_partitions():
+            name = partition['name']
+            suffix = name[len(prefix):]
+            if not suffix[:4].isdigit() or name >= first_kept:
+                continue
+            cursor.execute(
+                f'ALTER TABLE {connection.ops.quote_name(VIEW_TABLE)} '
+                f'DETACH PARTITION {connection.ops.quote_name(name)}'
+            )
+            if drop:
+                cursor.execute(
+                    f'DROP TABLE {connection.ops.quote_name(name)}'
+                )
+            detached.append(name)
+    return detached
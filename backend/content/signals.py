@@ -0,0 +1,76 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import receiver
+
+from content.models import Category, ContentFile, Topic
+
+
+def update_search_vector(**filters):
+    transaction.on_commit(
+        partial(ContentFile.objects.filter(**filters).update_search_vector)
+    )
+
+
+@receiver(post_save, sender=ContentFile)
+def content_file_saved(sender, instance, **kwargs):
+    """Reindex a file after its name or description changed."""
+    update_search_vector(pk=instance.pk)
+
+
+@receiver(m2m_changed, sender=ContentFile.categories.through)
+@receiver(m2m_changed, sender=ContentFile.topics.through)
+def content_file_sections_changed(
+    sender,
+    instance,
+    action,
+    reverse,
+    pk_set,
+    **kwargs
+):
+    """Reindex files whose topics or categories were changed."""
+    if not reverse:
+        if action.startswith('post_'):
+            update_search_vector(pk=instance.pk)
+    elif action == 'pre_clear':
+        instance._cleared_file_pks = list(
+            instance.files.values_list('pk', flat=True)
+        )
+    elif action == 'post_clear':
+        update_search_vector(pk__in=instance._cleared_file_pks)
+    elif action.startswith('post_'):
+        update_search_vector(pk__in=pk_set)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    """Reindex the files of a renamed category."""
+    update_search_vector(categories=instance)
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, **kwargs):
+    """Reindex the files of a renamed topic."""
+    update_search_vector(topics=instance)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Topic)
+def section_deleting(sender, instance, **kwargs):
+    """Remember the files of a section before its links are deleted."""
+    instance._deleted_file_pks = list(
+        instance.files.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Topic)
+def section_deleted(sender, instance, **kwargs):
+    """Reindex the files of a deleted category or topic."""
+    update_search_vector(pk__in=instance._deleted_file_pks)
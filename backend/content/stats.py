@@ -0,0 +1,231 @@
+from collections import Counter, defaultdict
+from datetime import date
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from content.hll import HyperLogLog
+from content.models import (
+    ContentViewStat,
+    DailyActiveUser,
+    DailyContentSketch,
+    DailyContentUser,
+    DailyContentViews,
+    DailyNewUsers,
+    DailyUserSketch
+)
+from users.models import BotUser
+
+
+def increment_counters(model, key_fields: list[str], field: str, counts):
+    """Add counts ({key tuple: amount}) to a rollup in one upsert."""
+    if not counts:
+        return
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = [model._meta.get_field(name).column for name in key_fields]
+    value = model._meta.get_field(field).column
+    placeholders = ', '.join(['(%s)' % ', '.join(
+        ['%s'] * (len(columns) + 1)
+    )] * len(counts))
+    params = [
+        param for key, amount in counts.items() for param in (*key, amount)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(columns)}, {value}) '
+            f'VALUES {placeholders} '
+            f'ON CONFLICT ({", ".join(columns)}) '
+            f'DO UPDATE SET {value} = {table}.{value} + EXCLUDED.{value}',
+            params
+        )
+
+
+def merge_sketches(model, key_fields: list[str], users: dict):
+    """Add user ids ({key tuple: ids}) to the stored daily sketches.
+
+    Missing sketches are first inserted empty, so that every key has a
+    row to lock. The rows are then locked in key order, which keeps
+    concurrent writers from deadlocking, merged in memory and written
+    back in one upsert.
+    """
+    if not users:
+        return
+    attnames = [model._meta.get_field(name).attname for name in key_fields]
+    keys = sorted(users)
+    empty = HyperLogLog().to_bytes()
+    model.objects.bulk_create(
+        [model(**dict(zip(attnames, key)), sketch=empty) for key in keys],
+        ignore_conflicts=True
+    )
+    key_filter = Q()
+    for key in keys:
+        key_filter |= Q(**dict(zip(key_fields, key)))
+    sketches = {
+        tuple(row[:-1]): HyperLogLog(row[-1])
+        for row in model.objects.select_for_update().filter(
+            key_filter
+        ).order_by(*key_fields).values_list(*key_fields, 'sketch')
+    }
+    objs = []
+    for key in keys:
+        sketch = sketches[key]
+        sketch.update(users[key])
+        objs.append(model(
+            **dict(zip(attnames, key)),
+            sketch=sketch.to_bytes()
+        ))
+    model.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=key_fields,
+        update_fields=['sketch']
+    )
+
+
+def add_view_rollups(views: list[ContentViewStat]):
+    """Count freshly inserted views in the daily rollups and sketches."""
+    active_users = set()
+    content_views = Counter()
+    day_users = defaultdict(set)
+    content_users = defaultdict(set)
+    for view in views:
+        day = timezone.localdate(view.viewed_at)
+        active_users.add((day, view.user_id))
+        content_views[day, view.content_file_id] += 1
+        day_users[(day,)].add(view.user_id)
+        content_users[day, view.content_file_id].add(view.user_id)
+    DailyActiveUser.objects.bulk_create(
+        [DailyActiveUser(day=day, user_id=pk) for day, pk in active_users],
+        ignore_conflicts=True
+    )
+    DailyContentUser.objects.bulk_create(
+        [
+            DailyContentUser(day=day, content_file_id=content_id, user_id=pk)
+            for (day, content_id), pks in content_users.items()
+            for pk in pks
+        ],
+        ignore_conflicts=True
+    )
+    increment_counters(
+        DailyContentViews, ['day', 'content_file'], 'views', content_views
+    )
+    merge_sketches(DailyUserSketch, ['day'], day_users)
+    merge_sketches(
+        DailyContentSketch, ['day', 'content_file'], content_users
+    )
+
+
+def add_new_users(days: list[date]):
+    """Count users created on the given days."""
+    increment_counters(
+        DailyNewUsers,
+        ['day'],
+        'users',
+        {(day,): amount for day, amount in Counter(days).items()}
+    )
+
+
+def insert_from_select(model, fields: list[str], queryset):
+    """INSERT INTO the model's table the rows of a values() queryset."""
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(model._meta.get_field(name).column for name in fields)
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {table} ({columns}) {sql}', params)
+        return cursor.rowcount
+
+
+def rebuild_sketches(views) -> int:
+    """Rebuild daily sketches from views annotated with their day.
+
+    Views are read in time order and written one day at a time, so only
+    the sketches of a single day are held in memory.
+    """
+    written = 0
+    current_day = None
+    day_users = HyperLogLog()
+    content_users = defaultdict(HyperLogLog)
+
+    def write_day():
+        DailyUserSketch.objects.create(
+            day=current_day,
+            sketch=day_users.to_bytes()
+        )
+        DailyContentSketch.objects.bulk_create([
+            DailyContentSketch(
+                day=current_day,
+                content_file_id=content_id,
+                sketch=sketch.to_bytes()
+            )
+            for content_id, sketch in content_users.items()
+        ])
+        return 1 + len(content_users)
+
+    for day, content_id, user_id in views.order_by(
+        'viewed_at'
+    ).values_list('day', 'content_file_id', 'user_id').iterator():
+        if day != current_day:
+            if current_day is not None:
+                written += write_day()
+            current_day = day
+            day_users = HyperLogLog()
+            content_users.clear()
+        day_users.add(user_id)
+        content_users[content_id].add(user_id)
+    if current_day is not None:
+        written += write_day()
+    return written
+
+
+@transaction.atomic
+def rebuild_rollups(since: date | None = None) -> dict:
+    """Recompute the daily rollups from raw data, from since or entirely.
+
+    Returns the number of rows written to each rollup.
+    """
+    views = ContentViewStat.objects.annotate(day=TruncDate('viewed_at'))
+    users = BotUser.objects.annotate(day=TruncDate('created_at'))
+    rollups = [
+        DailyActiveUser,
+        DailyContentUser,
+        DailyContentViews,
+        DailyNewUsers,
+        DailyUserSketch,
+        DailyContentSketch
+    ]
+    if since is not None:
+        views = views.filter(day__gte=since)
+        users = users.filter(day__gte=since)
+        for model in rollups:
+            model.objects.filter(day__gte=since).delete()
+    else:
+        for model in rollups:
+            model.objects.all().delete()
+    return {
+        'active_users': insert_from_select(
+            DailyActiveUser,
+            ['day', 'user'],
+            views.values('day', 'user_id').distinct().order_by()
+        ),
+        'content_users': insert_from_select(
+            DailyContentUser,
+            ['day', 'content_file', 'user'],
+            views.values('day', 'content_file_id', 'user_id').distinct(
+            ).order_by()
+        ),
+        'content_views': insert_from_select(
+            DailyContentViews,
+            ['day', 'content_file', 'views'],
+            views.values('day', 'content_file_id').annotate(
+                views=Count('id')
+            ).order_by()
+        ),
+        'new_users': insert_from_select(
+            DailyNewUsers,
+            ['day', 'users'],
+            users.values('day').annotate(users=Count('id')).order_by()
+        ),
+        'sketches': rebuild_sketches(views),
+    }
@@ -3,7 +3,14 @@
 python manage.py migrate
 python manage.py collectstatic --noinput
 
-python manage.py runstatbot &
-python manage.py runbot &
+PROCESS_ROLE=statbot python manage.py runstatbot &
+if [ -n "$TELEGRAM_WEBHOOK_URL" ]; then
+    PROCESS_ROLE=bot python manage.py runbot --webhook &
+    for i in $(seq 2 "${TELEGRAM_BOT_WORKERS:-1}"); do
+        PROCESS_ROLE=bot python manage.py runbot --webhook --no-scheduler &
+    done
+else
+    PROCESS_ROLE=bot python manage.py runbot &
+fi
 
 exec gunicorn --bind 0.0.0.0:8000 backend.wsgi --access-logfile="-" --error-logfile="-"
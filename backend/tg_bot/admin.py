@@ -1,9 +1,26 @@
 from django.contrib import admin
 
-from tg_bot.models import BotMessage
+from tg_bot.models import BotMessage, Broadcast
 
 
 @admin.register(BotMessage)
 class BotMessageAdmin(admin.ModelAdmin):
     list_display = ['key', 'text', 'updated_at']
     search_fields = ['key', 'text', 'comment']
+
+
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = [
+        'created_at', 'status', 'total', 'sent', 'blocked', 'failed'
+    ]
+    list_filter = ['status']
+    readonly_fields = [
+        'total',
+        'sent',
+        'blocked',
+        'failed',
+        'unknown',
+        'started_at',
+        'finished_at',
+    ]
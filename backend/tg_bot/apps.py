@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BotConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tg_bot'
+
+    def ready(self):
+        import tg_bot.signals  # noqa: F401
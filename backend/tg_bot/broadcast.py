@@ -0,0 +1,391 @@
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError
+)
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from tg_bot.constants import (
+    BROADCAST_BATCH_SIZE,
+    BROADCAST_HEARTBEAT_PERIOD,
+    BROADCAST_POLL_PERIOD,
+    BROADCAST_PREPARE_TIMEOUT,
+    BROADCAST_RATE,
+    BROADCAST_RETRIES,
+    BROADCAST_SEND_CHUNK_SIZE,
+    BROADCAST_STALE_AFTER,
+    BROADCAST_WORKERS,
+    REMINDER_RATE
+)
+from tg_bot.db import db_sync_to_async, run_db
+from tg_bot.models import Broadcast, BroadcastBatch, BroadcastRecipient
+from users.models import BotUser
+
+
+SENT = 'sent'
+BLOCKED = 'blocked'
+FAILED = 'failed'
+
+
+class TokenBucket:
+    """Async rate limiter: rate tokens per second, bursts up to capacity."""
+
+    def __init__(self, rate: float = BROADCAST_RATE, capacity: int = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Hand out no tokens for seconds, e.g. after a RetryAfter.
+
+        The bucket is emptied, so sending resumes at rate, not in a burst.
+        """
+        until = time.monotonic() + seconds
+        if until > self._paused_until:
+            self._paused_until = until
+            self._tokens = 0
+            self._updated = until
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def send_with_retry(
+    bot: Bot,
+    limiter: TokenBucket,
+    chat_id: int,
+    retries: int = BROADCAST_RETRIES,
+    **kwargs
+) -> str:
+    """Send a message under the rate limit.
+
+    RetryAfter pauses the shared limiter so all senders wait it out.
+    RetryAfter, network and server errors are retried. Returns SENT,
+    BLOCKED when the user can no longer be reached, or FAILED.
+    """
+    for attempt in range(retries):
+        await limiter.acquire()
+        try:
+            await bot.send_message(chat_id=chat_id, **kwargs)
+            return SENT
+        except TelegramRetryAfter as e:
+            limiter.pause(e.retry_after)
+        except TelegramForbiddenError:
+            return BLOCKED
+        except TelegramBadRequest as e:
+            if 'chat not found' in e.message.lower():
+                return BLOCKED
+            print(f'Ошибка отправки сообщения {chat_id}: {e}')
+            return FAILED
+        except (TelegramNetworkError, TelegramServerError) as e:
+            if attempt == retries - 1:
+                print(f'Ошибка отправки сообщения {chat_id}: {e}')
+            else:
+                await asyncio.sleep(2 ** attempt)
+    return FAILED
+
+
+def deactivate_bot_users(telegram_ids: list[int]) -> int:
+    """Stop messaging users who blocked the bot."""
+    return BotUser.objects.filter(
+        telegram_id__in=telegram_ids
+    ).update(is_active=False)
+
+
+# Separate buckets keep reminders from slowing broadcasts down, while
+# together they stay under Telegram's limit.
+broadcast_limiter = TokenBucket()
+reminder_limiter = TokenBucket(REMINDER_RATE)
+
+RESULT_STATUSES = {
+    SENT: BroadcastRecipient.Status.SENT,
+    BLOCKED: BroadcastRecipient.Status.BLOCKED,
+    FAILED: BroadcastRecipient.Status.FAILED,
+}
+STATUS_COUNTERS = {
+    BroadcastRecipient.Status.SENT: 'sent',
+    BroadcastRecipient.Status.BLOCKED: 'blocked',
+    BroadcastRecipient.Status.FAILED: 'failed',
+    BroadcastRecipient.Status.UNKNOWN: 'unknown',
+}
+
+
+@transaction.atomic
+def prepare_broadcast(
+    broadcast_id: int,
+    batch_size: int = BROADCAST_BATCH_SIZE
+):
+    """Split the active users into persisted batches and start sending.
+
+    Runs in one transaction, so an interrupted split is simply redone.
+    """
+    broadcast = Broadcast.objects.select_for_update().filter(
+        id=broadcast_id,
+        status=Broadcast.Status.PENDING
+    ).first()
+    if broadcast is None:
+        return
+    number = 0
+    after_id = 0
+    while True:
+        user_ids = list(
+            BotUser.objects.filter(
+                is_active=True,
+                id__gt=after_id
+            ).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not user_ids:
+            break
+        after_id = user_ids[-1]
+        number += 1
+        batch = BroadcastBatch.objects.create(
+            broadcast=broadcast,
+            number=number
+        )
+        BroadcastRecipient.objects.bulk_create([
+            BroadcastRecipient(broadcast=broadcast, batch=batch, user_id=pk)
+            for pk in user_ids
+        ])
+        broadcast.total += len(user_ids)
+    broadcast.status = (
+        Broadcast.Status.RUNNING if number else Broadcast.Status.DONE
+    )
+    broadcast.started_at = timezone.now()
+    if not number:
+        broadcast.finished_at = broadcast.started_at
+    broadcast.save()
+
+
+@transaction.atomic
+def claim_batch(worker: str, stale_after: int = BROADCAST_STALE_AFTER):
+    """Lease the next batch of a running broadcast to a worker.
+
+    Recipients stay PENDING; each is marked SENDING only right before
+    its message goes out (start_sending). The worker renews claimed_at,
+    so a lease older than stale_after seconds belongs to a crashed
+    worker: the batch is taken over, recipients that were in flight
+    become UNKNOWN instead of being sent twice, and the PENDING ones are
+    sent by the new worker.
+    Returns (batch id, text, [(recipient id, telegram id)]) or None.
+    """
+    now = timezone.now()
+    batch = BroadcastBatch.objects.select_for_update(
+        skip_locked=True,
+        of=('self',)
+    ).filter(
+        Q(status=BroadcastBatch.Status.PENDING)
+        | Q(
+            status=BroadcastBatch.Status.CLAIMED,
+            claimed_at__lt=now - timedelta(seconds=stale_after)
+        ),
+        broadcast__status=Broadcast.Status.RUNNING
+    ).select_related('broadcast').order_by('broadcast_id', 'number').first()
+    if batch is None:
+        return None
+    recipients = batch.recipients.all()
+    if batch.status == BroadcastBatch.Status.CLAIMED:
+        unknown = recipients.filter(
+            status=BroadcastRecipient.Status.SENDING
+        ).update(status=BroadcastRecipient.Status.UNKNOWN)
+        Broadcast.objects.filter(id=batch.broadcast_id).update(
+            unknown=F('unknown') + unknown
+        )
+    batch.status = BroadcastBatch.Status.CLAIMED
+    batch.claimed_by = worker
+    batch.claimed_at = now
+    batch.save(update_fields=['status', 'claimed_by', 'claimed_at'])
+    targets = list(recipients.filter(
+        status=BroadcastRecipient.Status.PENDING
+    ).order_by('id').values_list('id', 'user__telegram_id'))
+    return batch.id, batch.broadcast.text, targets
+
+
+def get_leased_batch(batch_id: int, worker: str):
+    """Lock a batch if the worker still holds its lease."""
+    return BroadcastBatch.objects.select_for_update().filter(
+        id=batch_id,
+        status=BroadcastBatch.Status.CLAIMED,
+        claimed_by=worker
+    ).first()
+
+
+def renew_claim(batch_id: int, worker: str):
+    """Show that the worker sending a batch is still alive."""
+    BroadcastBatch.objects.filter(
+        id=batch_id,
+        status=BroadcastBatch.Status.CLAIMED,
+        claimed_by=worker
+    ).update(claimed_at=timezone.now())
+
+
+async def keep_claim(
+    batch_id: int,
+    worker: str,
+    period: int = BROADCAST_HEARTBEAT_PERIOD
+):
+    """Renew the claim on a batch every period seconds until cancelled."""
+    while True:
+        await asyncio.sleep(period)
+        try:
+            await run_db(renew_claim, batch_id, worker)
+        except Exception as e:
+            print(f'Ошибка продления рассылки: {e}')
+
+
+@transaction.atomic
+def start_sending(batch_id: int, worker: str, recipient_ids: list[int]):
+    """Mark recipients SENDING just before their messages go out.
+
+    Returns False when the worker lost its lease, so it must stop.
+    """
+    if get_leased_batch(batch_id, worker) is None:
+        return False
+    BroadcastRecipient.objects.filter(
+        id__in=recipient_ids,
+        status=BroadcastRecipient.Status.PENDING
+    ).update(status=BroadcastRecipient.Status.SENDING)
+    return True
+
+
+@transaction.atomic
+def save_results(batch_id: int, results: dict):
+    """Store delivery results ({status: [recipient ids]}) of a batch."""
+    batch = BroadcastBatch.objects.get(id=batch_id)
+    now = timezone.now()
+    counters = {}
+    for status, recipient_ids in results.items():
+        updated = BroadcastRecipient.objects.filter(
+            id__in=recipient_ids,
+            status=BroadcastRecipient.Status.SENDING
+        ).update(
+            status=status,
+            sent_at=now if status == BroadcastRecipient.Status.SENT else None
+        )
+        field = STATUS_COUNTERS[status]
+        counters[field] = F(field) + updated
+    Broadcast.objects.filter(id=batch.broadcast_id).update(**counters)
+
+
+@transaction.atomic
+def finish_batch(batch_id: int, worker: str):
+    """Close a fully sent batch and its broadcast if it was the last one."""
+    batch = get_leased_batch(batch_id, worker)
+    if batch is None:
+        return
+    batch.status = BroadcastBatch.Status.DONE
+    batch.save(update_fields=['status'])
+    if not BroadcastBatch.objects.filter(
+        broadcast_id=batch.broadcast_id
+    ).exclude(status=BroadcastBatch.Status.DONE).exists():
+        Broadcast.objects.filter(
+            id=batch.broadcast_id,
+            status=Broadcast.Status.RUNNING
+        ).update(status=Broadcast.Status.DONE, finished_at=timezone.now())
+
+
+async def send_chunk(bot: Bot, limiter: TokenBucket, text: str, targets):
+    """Send to [(recipient id, telegram id)] and group the outcomes."""
+    outcomes = await asyncio.gather(*(
+        send_with_retry(bot, limiter, telegram_id, text=text)
+        for _, telegram_id in targets
+    ))
+    results = defaultdict(list)
+    blocked = []
+    for (recipient_id, telegram_id), outcome in zip(targets, outcomes):
+        results[RESULT_STATUSES[outcome]].append(recipient_id)
+        if outcome == BLOCKED:
+            blocked.append(telegram_id)
+    return dict(results), blocked
+
+
+async def send_batch(
+    bot: Bot,
+    worker: str,
+    limiter: TokenBucket = broadcast_limiter,
+    chunk_size: int = BROADCAST_SEND_CHUNK_SIZE
+):
+    """Claim and send one batch. Returns False when there is nothing to do.
+
+    Recipients are sent in small chunks, each marked SENDING first and
+    stored right after, so a crash leaves at most one chunk UNKNOWN.
+    """
+    claimed = await db_sync_to_async(claim_batch)(worker)
+    if claimed is None:
+        return False
+    batch_id, text, targets = claimed
+    heartbeat = asyncio.create_task(keep_claim(batch_id, worker))
+    try:
+        for start in range(0, len(targets), chunk_size):
+            chunk = targets[start:start + chunk_size]
+            if not await db_sync_to_async(start_sending)(
+                batch_id, worker, [recipient_id for recipient_id, _ in chunk]
+            ):
+                return True
+            results, blocked = await send_chunk(bot, limiter, text, chunk)
+            await db_sync_to_async(save_results)(batch_id, results)
+            if blocked:
+                await db_sync_to_async(deactivate_bot_users)(blocked)
+        await db_sync_to_async(finish_batch)(batch_id, worker)
+    finally:
+        heartbeat.cancel()
+    return True
+
+
+async def broadcast_worker(bot: Bot, poll_period: int):
+    worker = uuid.uuid4().hex
+    while True:
+        try:
+            for broadcast_id in await run_db(
+                lambda: list(Broadcast.objects.filter(
+                    status=Broadcast.Status.PENDING
+                ).values_list('id', flat=True))
+            ):
+                await run_db(
+                    prepare_broadcast,
+                    broadcast_id,
+                    timeout=BROADCAST_PREPARE_TIMEOUT
+                )
+            if await send_batch(bot, worker):
+                continue
+        except Exception as e:
+            print(f'Ошибка рассылки: {e}')
+        await asyncio.sleep(poll_period)
+
+
+async def start_broadcasts(
+    bot: Bot,
+    workers: int = BROADCAST_WORKERS,
+    poll_period: int = BROADCAST_POLL_PERIOD
+):
+    """Send broadcast batches with several concurrent workers."""
+    await asyncio.gather(*(
+        broadcast_worker(bot, poll_period) for _ in range(workers)
+    ))
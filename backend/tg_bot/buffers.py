@@ -0,0 +1,261 @@
+import asyncio
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from content.models import ContentFile, ContentViewStat
+from content.partitions import create_view_partitions
+from content.stats import add_new_users, add_view_rollups
+from tg_bot.cache import bot_user_ids
+from tg_bot.constants import (
+    CONTENT_VIEW_BATCH_SIZE,
+    CONTENT_VIEW_FLUSH_PERIOD,
+    CONTENT_VIEW_QUEUE_SIZE,
+    USER_ACTIVITY_FLUSH_PERIOD,
+    VIEW_PARTITIONS_PERIOD
+)
+from tg_bot.db import db_sync_to_async
+from users.models import BotUser
+
+
+USER_UPSERT_FIELDS = ['username', 'first_name', 'last_active', 'is_active']
+
+
+@transaction.atomic
+def upsert_bot_users(users: list[BotUser]) -> list[BotUser]:
+    """Create or update users in one statement. Returned objects carry pks.
+
+    The rows the statement inserted (xmax = 0) are counted in the new
+    users rollup by their created_at, so workers upserting the same new
+    user at once count it only once.
+    """
+    if not users:
+        return users
+    quote = connection.ops.quote_name
+    fields = [
+        BotUser._meta.get_field(name)
+        for name in ['telegram_id', *USER_UPSERT_FIELDS, 'created_at']
+    ]
+    columns = [quote(field.column) for field in fields]
+    placeholders = ', '.join(
+        ['(%s)' % ', '.join(['%s'] * len(fields))] * len(users)
+    )
+    params = [
+        field.get_db_prep_save(field.pre_save(user, True), connection)
+        for user in users
+        for field in fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote(BotUser._meta.db_table)} '
+            f'({", ".join(columns)}) VALUES {placeholders} '
+            f'ON CONFLICT ({columns[0]}) DO UPDATE SET '
+            + ', '.join(
+                f'{column} = EXCLUDED.{column}' for column in columns[1:-1]
+            )
+            + f' RETURNING {quote(BotUser._meta.pk.column)}, {columns[0]}, '
+            f'{columns[-1]}, (xmax = 0)',
+            params
+        )
+        rows = {row[1]: row for row in cursor.fetchall()}
+    new_days = []
+    for user in users:
+        user.pk, _, user.created_at, inserted = rows[user.telegram_id]
+        if inserted:
+            new_days.append(timezone.localdate(user.created_at))
+    add_new_users(new_days)
+    return users
+
+
+def refresh_last_active(telegram_ids: list[int]):
+    """Mark existing users as active now. Unknown ids are ignored."""
+    BotUser.objects.filter(
+        telegram_id__in=telegram_ids
+    ).update(last_active=timezone.now())
+
+
+class UserActivityBuffer:
+    """Coalesce user activity in memory and write it in bulk.
+
+    The first update of a user unknown to bot_user_ids is written
+    immediately so the row exists for handlers, and its pk is cached;
+    later ones only keep the latest values until the next flush.
+    """
+
+    def __init__(self, flush_period: int = USER_ACTIVITY_FLUSH_PERIOD):
+        self.flush_period = flush_period
+        self._pending = {}
+        self._seen = set()
+
+    @staticmethod
+    def make_user(tg_user) -> BotUser:
+        return BotUser(
+            telegram_id=tg_user.id,
+            username=tg_user.username or '',
+            first_name=tg_user.first_name or '',
+            last_active=timezone.now(),
+            is_active=True
+        )
+
+    async def touch(self, tg_user):
+        """Record activity of a Telegram user."""
+        user = self.make_user(tg_user)
+        if bot_user_ids.get(tg_user.id) is not None:
+            self._pending[tg_user.id] = user
+            return
+        user, = await db_sync_to_async(upsert_bot_users)([user])
+        bot_user_ids.set(tg_user.id, user.pk)
+
+    def seen(self, tg_user):
+        """Record activity that must not register a user (inline queries).
+
+        Only last_active of a user who already exists is refreshed.
+        """
+        self._seen.add(tg_user.id)
+
+    async def flush(self):
+        """Write all pending activity with a single upsert."""
+        pending, self._pending = self._pending, {}
+        seen, self._seen = self._seen, set()
+        try:
+            if pending:
+                await db_sync_to_async(upsert_bot_users)(
+                    list(pending.values())
+                )
+            seen.difference_update(pending)
+            if seen:
+                await db_sync_to_async(refresh_last_active)(list(seen))
+        except Exception:
+            for telegram_id, user in pending.items():
+                self._pending.setdefault(telegram_id, user)
+            self._seen.update(seen)
+            raise
+
+    async def run(self):
+        """Flush pending activity every flush_period seconds."""
+        while True:
+            await asyncio.sleep(self.flush_period)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f'Ошибка записи активности пользователей: {e}')
+
+
+@transaction.atomic
+def write_content_views(events: list[tuple], user_ids: dict) -> dict:
+    """Insert (telegram_id, content_id, viewed_at) events in bulk.
+
+    user_ids maps already known Telegram ids to BotUser pks; the rest are
+    resolved here and returned. The daily rollups are updated in the same
+    transaction.
+    """
+    missing_user_ids = dict(BotUser.objects.filter(
+        telegram_id__in={
+            telegram_id for telegram_id, _, _ in events
+            if telegram_id not in user_ids
+        }
+    ).values_list('telegram_id', 'id'))
+    user_ids = {**user_ids, **missing_user_ids}
+    content_ids = set(ContentFile.objects.filter(
+        id__in={content_id for _, content_id, _ in events}
+    ).values_list('id', flat=True))
+    views = ContentViewStat.objects.bulk_create(
+        [
+            ContentViewStat(
+                user_id=user_ids[telegram_id],
+                content_file_id=content_id,
+                viewed_at=viewed_at
+            )
+            for telegram_id, content_id, viewed_at in events
+            if telegram_id in user_ids and content_id in content_ids
+        ]
+    )
+    add_view_rollups(views)
+    return missing_user_ids
+
+
+class ContentViewBuffer:
+    """Bounded queue of content views drained by a background task.
+
+    When the queue is full new views are dropped and counted, so the
+    handlers never wait on the statistics path.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CONTENT_VIEW_QUEUE_SIZE,
+        batch_size: int = CONTENT_VIEW_BATCH_SIZE,
+        flush_period: int = CONTENT_VIEW_FLUSH_PERIOD
+    ):
+        self.batch_size = batch_size
+        self.flush_period = flush_period
+        self.dropped = 0
+        self._queue = asyncio.Queue(maxsize)
+        self._batch = []
+
+    def record(self, telegram_id: int, content_id: int):
+        """Enqueue a view without waiting."""
+        try:
+            self._queue.put_nowait((telegram_id, content_id, timezone.now()))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % self.batch_size == 1:
+                print(f'Очередь просмотров переполнена: {self.dropped}')
+
+    async def write(self):
+        events, self._batch = self._batch, []
+        if not events:
+            return
+        user_ids = {}
+        for telegram_id, _, _ in events:
+            user_id = bot_user_ids.get(telegram_id)
+            if user_id is not None:
+                user_ids[telegram_id] = user_id
+        missing_user_ids = await db_sync_to_async(write_content_views)(
+            events, user_ids
+        )
+        for telegram_id, user_id in missing_user_ids.items():
+            bot_user_ids.set(telegram_id, user_id)
+
+    async def run(self):
+        """Write views in batches of batch_size or every flush_period."""
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_period
+            while len(self._batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except TimeoutError:
+                    break
+            try:
+                await self.write()
+            except Exception as e:
+                print(f'Ошибка записи статистики: {e}')
+
+    async def flush(self):
+        """Write everything still queued, e.g. on shutdown."""
+        while not self._queue.empty():
+            self._batch.append(self._queue.get_nowait())
+        await self.write()
+
+
+async def start_view_partitions():
+    """Keep monthly view partitions created ahead of time."""
+    while True:
+        try:
+            created = await db_sync_to_async(create_view_partitions)()
+            if created:
+                print(f'Созданы разделы просмотров: {", ".join(created)}')
+        except Exception as e:
+            print(f'Ошибка создания разделов просмотров: {e}')
+        await asyncio.sleep(VIEW_PARTITIONS_PERIOD)
+
+
+user_activity_buffer = UserActivityBuffer()
+content_view_buffer = ContentViewBuffer()
@@ -0,0 +1,108 @@
+import inspect
+from collections import OrderedDict
+from functools import wraps
+
+from tg_bot.catalog import aget_catalog
+from tg_bot.constants import BOT_USER_ID_CACHE_SIZE, KEYBOARD_CACHE_SIZE
+from tg_bot.db import run_db
+from users.models import BotUser
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """Counters used to size the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class KeyboardCache(LRUCache):
+    """Rendered screens bound to a catalog version."""
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self.catalog_version = None
+
+    def sync_version(self, version: int):
+        """Drop every screen rendered for an older catalog."""
+        if version != self.catalog_version:
+            self.clear()
+            self.catalog_version = version
+
+
+keyboard_cache = KeyboardCache(KEYBOARD_CACHE_SIZE)
+bot_user_ids = LRUCache(BOT_USER_ID_CACHE_SIZE)
+
+
+async def aget_bot_user_id(telegram_id: int) -> int:
+    """Resolve a Telegram id to a BotUser pk, querying only on a miss."""
+    user_id = bot_user_ids.get(telegram_id)
+    if user_id is None:
+        user_id = await run_db(BotUser.objects.filter(
+            telegram_id=telegram_id
+        ).values_list('id', flat=True).get)
+        bot_user_ids.set(telegram_id, user_id)
+    return user_id
+
+
+def cached_screen(kind: str):
+    """Cache the result of a screen builder by its coordinates.
+
+    The key is the screen kind plus the bound builder arguments
+    (level1, level2, level3, page, content id).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            catalog = await aget_catalog()
+            keyboard_cache.sync_version(catalog.version)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (kind, *bound.arguments.values())
+            result = keyboard_cache.get(key)
+            if result is None:
+                result = await func(*args, **kwargs)
+                keyboard_cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
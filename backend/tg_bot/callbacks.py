@@ -110,6 +110,19 @@ class SearchCallback(CallbackData, prefix='search'):
     level3: int | None
 
 
+class PaginateSearchCallback(CallbackData, prefix='ps'):
+    """Search results pagination."""
+
+    token: str
+    page: int
+
+
+class SearchGlobalCallback(CallbackData, prefix='sg'):
+    """Repeat a scoped search over the whole catalog."""
+
+    token: str
+
+
 class RateCallback(CallbackData, prefix="rate"):
     """Start rating for a content item."""
 
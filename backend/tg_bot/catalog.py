@@ -0,0 +1,297 @@
+import itertools
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+from content.models import Category, ContentFile, Path, Topic
+from tg_bot.constants import CATALOG_TTL, INLINE_PREFIX_LENGTH
+from tg_bot.db import db_sync_to_async
+
+
+_versions = itertools.count(1)
+_lock = threading.Lock()
+_snapshot = None
+_generation = 0
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r'\w+', text.lower().replace('ё', 'е'))
+
+
+class PrefixIndex:
+    """Word prefix index over content names.
+
+    Every word prefix up to INLINE_PREFIX_LENGTH characters maps to the
+    ids of the names containing it, in name order. Longer query words are
+    checked against the words of the candidates.
+    """
+
+    def __init__(self, items):
+        self._words = {}
+        prefixes = defaultdict(list)
+        for item_id, name in items:
+            words = tuple(set(tokenize(name)))
+            self._words[item_id] = words
+            for prefix in {
+                word[:length]
+                for word in words
+                for length in range(1, INLINE_PREFIX_LENGTH + 1)
+                if length <= len(word)
+            }:
+                prefixes[prefix].append(item_id)
+        self._prefixes = {
+            prefix: tuple(ids) for prefix, ids in prefixes.items()
+        }
+
+    def search(self, query: str, limit: int) -> list[int]:
+        """Ids of names where every query word starts some word."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        candidates = sorted(
+            (self._prefixes.get(token[:INLINE_PREFIX_LENGTH], ())
+             for token in tokens),
+            key=len
+        )
+        others = [set(ids) for ids in candidates[1:]]
+        long_tokens = [
+            token for token in tokens if len(token) > INLINE_PREFIX_LENGTH
+        ]
+        found = []
+        for item_id in candidates[0]:
+            if not all(item_id in ids for ids in others):
+                continue
+            if long_tokens and not all(
+                any(word.startswith(token) for word in self._words[item_id])
+                for token in long_tokens
+            ):
+                continue
+            found.append(item_id)
+            if len(found) == limit:
+                break
+        return found
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Immutable navigation tree of the active catalog."""
+
+    version: int
+    built_at: float
+    generation: int
+    paths: tuple
+    category_names: MappingProxyType
+    topic_names: MappingProxyType
+    categories: MappingProxyType
+    topics: MappingProxyType
+    content_items: MappingProxyType
+    files: MappingProxyType
+    index: PrefixIndex
+
+    def get_category_name(self, category_id: int) -> str:
+        """Name of any category, including inactive ones."""
+        return self.category_names.get(category_id, '')
+
+    def get_topic_name(self, topic_id: int) -> str:
+        """Name of any topic, including inactive ones."""
+        return self.topic_names.get(topic_id, '')
+
+    def get_categories(self, level1_choice: int) -> tuple:
+        """Active categories of a path."""
+        return self.categories.get(level1_choice, ())
+
+    def get_topics(self, level1_choice: int, level2_choice: int) -> tuple:
+        """Active topics with active content in a path and category."""
+        return self.topics.get((level1_choice, level2_choice), ())
+
+    def has_topics(self, level1_choice: int, level2_choice: int) -> bool:
+        """Whether a category has active topics for this path."""
+        return (level1_choice, level2_choice) in self.topics
+
+    def get_content_items(
+        self,
+        level1_choice: int,
+        level2_choice: int,
+        level3_choice: int | None
+    ) -> tuple:
+        """Active content in a path, category and optional topic."""
+        return self.content_items.get(
+            (level1_choice, level2_choice, level3_choice or 0), ()
+        )
+
+    def search_files(self, query: str, limit: int) -> list:
+        """Reachable files whose name words start with the query words.
+
+        Each file carries the path and category it is listed under.
+        """
+        return [
+            self.files[file_id] for file_id in self.index.search(query, limit)
+        ]
+
+    def is_fresh(self) -> bool:
+        return (
+            self.generation == _generation
+            and time.monotonic() - self.built_at < CATALOG_TTL
+        )
+
+
+def _item(item_id: int, name: str) -> MappingProxyType:
+    return MappingProxyType({'name': name, 'id': item_id})
+
+
+def build_snapshot(
+    generation: int,
+    previous: CatalogSnapshot | None = None
+) -> CatalogSnapshot:
+    """Load the active navigation tree in one pass.
+
+    If the tree equals the previous snapshot, the previous one is kept
+    with a new build time, so its version and cached screens stay valid.
+    """
+    paths = tuple(
+        _item(path['id'], path['name'])
+        for path in Path.objects.values('id', 'name')
+    )
+    all_categories = list(Category.objects.order_by('name', 'id').values(
+        'id', 'name', 'path_id', 'is_active'
+    ))
+    path_categories = [
+        category for category in all_categories
+        if category['is_active'] and category['path_id'] is not None
+    ]
+    all_topics = list(Topic.objects.order_by('name', 'id').values(
+        'id', 'name', 'is_active'
+    ))
+    topic_order = {
+        topic['id']: (position, topic['name'])
+        for position, topic in enumerate(
+            topic for topic in all_topics if topic['is_active']
+        )
+    }
+    active_files = ContentFile.objects.filter(is_active=True)
+    file_links = {}
+    for field, column in (
+        ('paths', 'path_id'),
+        ('categories', 'category_id'),
+        ('topics', 'topic_id'),
+    ):
+        links = defaultdict(list)
+        through = getattr(ContentFile, field).through
+        for file_id, related_id in through.objects.filter(
+            contentfile__is_active=True
+        ).values_list('contentfile_id', column):
+            links[file_id].append(related_id)
+        file_links[field] = links
+    topic_ids = defaultdict(set)
+    content_items = defaultdict(list)
+    files = {}
+    for content_file in active_files.order_by('name', 'id').values(
+        'id', 'name'
+    ):
+        file_id = content_file['id']
+        item = _item(file_id, content_file['name'])
+        file_paths = file_links['paths'][file_id]
+        file_categories = file_links['categories'][file_id]
+        if file_paths and file_categories:
+            files[file_id] = MappingProxyType({
+                **item,
+                'level1': file_paths[0],
+                'level2': file_categories[0],
+            })
+        file_topics = [
+            topic_id for topic_id in file_links['topics'][file_id]
+            if topic_id in topic_order
+        ]
+        for path_id in file_links['paths'][file_id]:
+            for category_id in file_links['categories'][file_id]:
+                content_items[(path_id, category_id, 0)].append(item)
+                for topic_id in file_topics:
+                    content_items[(path_id, category_id, topic_id)].append(
+                        item
+                    )
+                    topic_ids[(path_id, category_id)].add(topic_id)
+    topics = {
+        key: tuple(
+            _item(topic_id, topic_order[topic_id][1])
+            for topic_id in sorted(ids, key=lambda pk: topic_order[pk][0])
+        )
+        for key, ids in topic_ids.items()
+    }
+    categories = defaultdict(list)
+    for category in path_categories:
+        path_id = category['path_id']
+        categories[path_id].append(MappingProxyType({
+            'name': category['name'],
+            'id': category['id'],
+            'has_topics': (path_id, category['id']) in topics,
+        }))
+    tree = {
+        'paths': paths,
+        'category_names': MappingProxyType({
+            category['id']: category['name'] for category in all_categories
+        }),
+        'topic_names': MappingProxyType({
+            topic['id']: topic['name'] for topic in all_topics
+        }),
+        'categories': MappingProxyType(
+            {key: tuple(value) for key, value in categories.items()}
+        ),
+        'topics': MappingProxyType(topics),
+        'content_items': MappingProxyType(
+            {key: tuple(value) for key, value in content_items.items()}
+        ),
+        'files': MappingProxyType(files),
+    }
+    if previous is not None and all(
+        getattr(previous, name) == value for name, value in tree.items()
+    ):
+        return replace(
+            previous,
+            built_at=time.monotonic(),
+            generation=generation
+        )
+    return CatalogSnapshot(
+        version=next(_versions),
+        built_at=time.monotonic(),
+        generation=generation,
+        **tree,
+        index=PrefixIndex(
+            (file_id, item['name']) for file_id, item in files.items()
+        ),
+    )
+
+
+def get_catalog() -> CatalogSnapshot:
+    """Return the current snapshot, rebuilding it if it is outdated."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh():
+        return snapshot
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or not snapshot.is_fresh():
+            snapshot = build_snapshot(_generation, snapshot)
+            _snapshot = snapshot
+    return snapshot
+
+
+async def aget_catalog() -> CatalogSnapshot:
+    """Async access to the snapshot without a thread hop when it is fresh."""
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh():
+        return snapshot
+    return await db_sync_to_async(get_catalog)()
+
+
+def invalidate_catalog():
+    """Mark the snapshot as outdated so the next access rebuilds it."""
+    global _generation
+    _generation += 1
+
+
+async def on_catalog_changed(payload: str | None):
+    """NOTIFY handler for edits made in other processes."""
+    invalidate_catalog()
@@ -38,10 +38,60 @@ NEXT_PAGE_BTN = 'Следующая ▶️'
 TO_DESCRIPTION_BTN = '⬅️ Назад к описанию'
 TO_LIST_BTN = '⬅️ Назад к списку'
 SEARCH_BTN = '🔍 Поиск'
-SEARCH_HINT_MSG = 'Введите запрос для поиска материала по названию:'
+SEARCH_HINT_MSG = (
+    'Введите запрос для поиска материала по названию, описанию, '
+    'теме или категории:'
+)
 SEARCH_REPEAT_BTN = '🔍 Повторить поиск'
 SEARCH_RESULTS_MSG = 'Результаты поиска для "{}":'
+SEARCH_GLOBAL_RESULTS_MSG = 'Результаты поиска по всем материалам для "{}":'
+SEARCH_GLOBAL_BTN = '🌐 Искать везде'
 SEARCH_NOT_FOUND_MSG = 'Материалы не найдены. Попробуйте другой запрос.'
+SEARCH_EXPIRED_MSG = 'Результаты поиска устарели. Повторите поиск.'
+INLINE_OPEN_BTN = '📖 Открыть в боте'
 RATING_BTN = '⭐ Оценить материал'
 RATING_REPLY_MSG = 'Спасибо за оценку!'
 ERROR_MSG = 'Ошибка: {}'
+CATALOG_TTL = 60
+KEYBOARD_CACHE_SIZE = 1024
+NOTIFY_RECONNECT_DELAY = 1
+MEDIA_SEND_METHODS = {
+    'IMAGE': ('send_photo', 'photo'),
+    'VIDEO': ('send_video', 'video'),
+    'PDF': ('send_document', 'document'),
+    'AUDIO': ('send_audio', 'audio'),
+}
+WARM_MEDIA_CONCURRENCY = 4
+WARM_MEDIA_RETRIES = 5
+WEBHOOK_HOST = '0.0.0.0'
+WEBHOOK_PORT = 8081
+FSM_TTL = 86400
+FSM_CLEANUP_PERIOD = 600
+FSM_CLEANUP_BATCH_SIZE = 1000
+USER_ACTIVITY_FLUSH_PERIOD = 5
+CONTENT_VIEW_QUEUE_SIZE = 10000
+CONTENT_VIEW_BATCH_SIZE = 500
+CONTENT_VIEW_FLUSH_PERIOD = 2
+VIEW_PARTITIONS_PERIOD = 24 * 60 * 60
+BOT_USER_ID_CACHE_SIZE = 100000
+DB_POOL_STATS_PERIOD = 300
+SEARCH_SESSION_TTL = 3600
+SEARCH_SESSION_CACHE_SIZE = 1024
+SEARCH_TOKEN_BYTES = 6
+SEARCH_CLEANUP_PERIOD = 600
+INLINE_PREFIX_LENGTH = 10
+INLINE_RESULTS_LIMIT = 50
+INLINE_CACHE_TIME = 300
+CONTENT_START_PREFIX = 'c'
+# Telegram allows about 30 messages per second per bot in total.
+BROADCAST_RATE = 28
+REMINDER_RATE = 2
+BROADCAST_RETRIES = 5
+BROADCAST_CHUNK_SIZE = 1000
+BROADCAST_BATCH_SIZE = 100
+BROADCAST_SEND_CHUNK_SIZE = 20
+BROADCAST_WORKERS = 2
+BROADCAST_POLL_PERIOD = 5
+BROADCAST_STALE_AFTER = 300
+BROADCAST_HEARTBEAT_PERIOD = 60
+BROADCAST_PREPARE_TIMEOUT = 600
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+
+from tg_bot.constants import DB_POOL_STATS_PERIOD
+
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.BOT_DB_THREADS,
+    thread_name_prefix='bot-db'
+)
+
+
+def _run(func, *args, **kwargs):
+    """Run ORM code in a pool thread and release its connection.
+
+    With pooling the connection goes back to the pool after every call,
+    so threads share the pool instead of each holding a connection.
+    """
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if getattr(connection, 'pool', None) is not None:
+            connection.close()
+        elif connection.errors_occurred:
+            if connection.is_usable():
+                connection.errors_occurred = False
+            else:
+                connection.close()
+
+
+def _with_statement_timeout(timeout: float, func, *args, **kwargs):
+    """Run func in a transaction whose queries may last timeout seconds.
+
+    Overrides the statement_timeout of bot connections for a longer call.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('statement_timeout', %s, true)",
+                [f'{int(timeout * 1000)}ms']
+            )
+        return func(*args, **kwargs)
+
+
+async def run_db(func, *args, timeout: float | None = None, **kwargs):
+    """Await a blocking ORM call on the bot database thread pool.
+
+    Unlike sync_to_async (and Django's a* ORM methods, which wrap it with
+    thread_sensitive=True) calls from concurrent updates run in parallel.
+    Awaiting stops after the timeout; the query itself is cancelled by
+    the server's statement_timeout, which a custom timeout raises.
+    """
+    loop = asyncio.get_running_loop()
+    if timeout is not None and connection.vendor == 'postgresql':
+        func = partial(_with_statement_timeout, timeout, func)
+    return await asyncio.wait_for(
+        loop.run_in_executor(executor, partial(_run, func, *args, **kwargs)),
+        timeout or settings.BOT_DB_TIMEOUT
+    )
+
+
+def db_sync_to_async(func=None, *, timeout: float | None = None):
+    """Drop-in replacement for sync_to_async that uses run_db."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_db(func, *args, timeout=timeout, **kwargs)
+        return wrapper
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+def get_pool_stats() -> dict:
+    """Size and wait-time counters of this process' connection pool."""
+    pool = getattr(connections['default'], 'pool', None)
+    if pool is None:
+        return {}
+    return pool.get_stats()
+
+
+async def start_pool_stats_logging(period: int = DB_POOL_STATS_PERIOD):
+    """Log connection pool counters every period seconds."""
+    while True:
+        await asyncio.sleep(period)
+        stats = get_pool_stats()
+        if stats:
+            logger.info('DB pool: %s', stats)
@@ -1,88 +1,79 @@
 import asyncio
+from functools import partial
 
 from aiogram import Bot, Router
-from aiogram.filters import CommandStart
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import CommandObject, CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import (
     CallbackQuery,
     FSInputFile,
     InlineKeyboardButton,
+    InlineQuery,
     Message
 )
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from asgiref.sync import sync_to_async
-from django.core.exceptions import ObjectDoesNotExist
-from django.core.paginator import Paginator
 
 import tg_bot.callbacks as cb
 import tg_bot.keyboards as kb
 
 from content.constants import EMOJI_FOR_RATING, MIN_RATING_INT, MAX_RATING_INT
-from content.models import Category, ContentFile, ContentRating, Topic
-from tg_bot.models import BotMessage
+from content.models import ContentRating
+from tg_bot.cache import aget_bot_user_id
+from tg_bot.catalog import aget_catalog
+from tg_bot.db import db_sync_to_async
+from tg_bot.messages import aget_bot_message
+from tg_bot.search import acreate_search_session, aget_search_session
 from tg_bot.constants import (
-    BACK_BTN,
     CONTENT_HEADER,
+    CONTENT_START_PREFIX,
     ERROR_MSG,
     FILE_LOADING_MSG,
+    INLINE_CACHE_TIME,
     LEVEL_TEXTS,
+    MEDIA_SEND_METHODS,
     NEXT_PAGE_BTN,
     RATING_REPLY_MSG,
+    SEARCH_EXPIRED_MSG,
+    SEARCH_GLOBAL_RESULTS_MSG,
     SEARCH_HINT_MSG,
     SEARCH_NOT_FOUND_MSG,
-    SEARCH_REPEAT_BTN,
     SEARCH_RESULTS_MSG,
     TOPIC_NAME_FORMAT,
     PREVIOUS_PAGE_BTN,
     TO_DESCRIPTION_BTN
 )
-from users.models import BotUser
+from tg_bot.utils import get_sent_file_ids
 
 
 router = Router()
 
 
-async def aget_object_or_default(model, key, default_message):
-    try:
-        message = await model.objects.aget(
-            key=key
-        )
-        return message.text
-    except ObjectDoesNotExist:
-        return default_message
+async def aget_3level_or_default(key, category):
+    text = await aget_bot_message(key, LEVEL_TEXTS['level3'])
+    return LEVEL_TEXTS['level3cat'].format(category) + text
 
 
-async def aget_3level_or_default(model, key, category):
-    try:
-        message = await model.objects.aget(
-            key=key
-        )
-        return LEVEL_TEXTS['level3cat'].format(category) + message.text
-    except ObjectDoesNotExist:
-        return (
-            LEVEL_TEXTS['level3cat'].format(category) + LEVEL_TEXTS['level3']
-        )
-
-
-async def get_category(category_id: int) -> Category:
-    """Fetch a Category object by ID."""
-    return await sync_to_async(Category.objects.get)(id=category_id)
+async def get_category_name(category_id: int) -> str:
+    """Category name from the catalog snapshot."""
+    catalog = await aget_catalog()
+    return catalog.get_category_name(category_id)
 
 
 async def get_topic_name(topic_id: int | None) -> str:
     """Get formatted topic name or empty string if no topic."""
     if topic_id:
-        topic = await sync_to_async(Topic.objects.get)(id=topic_id)
-        return TOPIC_NAME_FORMAT.format(topic.name)
+        catalog = await aget_catalog()
+        return TOPIC_NAME_FORMAT.format(catalog.get_topic_name(topic_id))
     return ''
 
 
 async def get_content_header(category_id: int, topic_id: int | None) -> str:
     """Generate content menu header."""
-    category = await get_category(category_id)
+    category_name = await get_category_name(category_id)
     topic_name = await get_topic_name(topic_id)
-    return CONTENT_HEADER.format(category.name, topic_name)
+    return CONTENT_HEADER.format(category_name, topic_name)
 
 
 async def edit_message(
@@ -116,52 +107,70 @@ async def send_media_file(
     markup = await kb.get_media_back_keyboard(
         level1, level2, level3, content_item_id
     )
+    send_method = MEDIA_SEND_METHODS.get(media_data['content_type'])
     try:
-        file = FSInputFile(media_data['file_path'])
-        caption = f'<b>{media_data.get('title', 'Медиафайл')}</b>'
-        if media_data['content_type'] == 'IMAGE':
-            await bot.send_photo(
-                chat_id=query.from_user.id,
-                photo=file,
-                caption=caption,
-                reply_markup=markup,
-                parse_mode='HTML'
-            )
-        elif media_data['content_type'] == 'VIDEO':
-            await bot.send_video(
-                chat_id=query.from_user.id,
-                video=file,
-                caption=caption,
-                reply_markup=markup,
-                parse_mode='HTML'
-            )
-        elif media_data['content_type'] == 'PDF':
-            await bot.send_document(
-                chat_id=query.from_user.id,
-                document=file,
-                caption=caption,
-                reply_markup=markup,
-                parse_mode='HTML'
-            )
-        elif media_data['content_type'] == 'AUDIO':
-            await bot.send_audio(
+        if send_method:
+            method_name, field = send_method
+            send = partial(
+                getattr(bot, method_name),
                 chat_id=query.from_user.id,
-                audio=file,
-                caption=caption,
+                caption=f'<b>{media_data.get('title', 'Медиафайл')}</b>',
                 reply_markup=markup,
                 parse_mode='HTML'
             )
+            message = None
+            if media_data['telegram_file_id']:
+                try:
+                    message = await send(
+                        **{field: media_data['telegram_file_id']}
+                    )
+                except TelegramBadRequest:
+                    message = None
+            if message is None:
+                message = await send(
+                    **{field: FSInputFile(media_data['file_path'])}
+                )
+                sent_file_ids = get_sent_file_ids(message)
+                if sent_file_ids:
+                    await kb.save_media_file_ids(
+                        content_item_id,
+                        *sent_file_ids
+                    )
         await query.answer('Материал отправлен!')
     except Exception as e:
         await query.message.edit_text(f'Ошибка отправки материала: {str(e)}')
 
 
+@router.message(CommandStart(deep_link=True))
+async def cmd_start_content(message: Message, command: CommandObject):
+    """Open a content item from an inline search deep link."""
+    payload = command.args or ''
+    content_id = payload.removeprefix(CONTENT_START_PREFIX)
+    catalog = await aget_catalog()
+    content_file = (
+        catalog.files.get(int(content_id))
+        if payload.startswith(CONTENT_START_PREFIX) and content_id.isdigit()
+        else None
+    )
+    if content_file is None:
+        await cmd_start(message)
+        return
+    text, markup = await kb.get_content_description(
+        content_file['level1'],
+        content_file['level2'],
+        0,
+        content_file['id']
+    )
+    await message.answer(text, reply_markup=markup, parse_mode='HTML')
+    await message.delete()
+
+
 @router.message(CommandStart())
 async def cmd_start(message: Message):
     """Handler for the start command. Representation for Level 1 buttons."""
     await message.answer(
-        await aget_object_or_default(
-            BotMessage, 'level1', LEVEL_TEXTS['level1']
+        await aget_bot_message(
+            'level1', LEVEL_TEXTS['level1']
         ),
         reply_markup=await kb.get_level1_menu(),
         parse_mode='HTML'
@@ -177,8 +186,8 @@ async def handle_level1(
     """Handler for Level 1 buttons. Representation for Level 2 buttons."""
     await edit_message(
         callback,
-        text=await aget_object_or_default(
-            BotMessage, 'level2', LEVEL_TEXTS['level2']
+        text=await aget_bot_message(
+            'level2', LEVEL_TEXTS['level2']
         ),
         markup=await kb.get_level2_menu(level1_choice=callback_data.choice)
     )
@@ -192,8 +201,8 @@ async def handle_paginate_level2(
     """Handler for Level 1 buttons. Pagination for Level 2 buttons."""
     await edit_message(
         callback,
-        text=await aget_object_or_default(
-            BotMessage, 'level2', LEVEL_TEXTS['level2']
+        text=await aget_bot_message(
+            'level2', LEVEL_TEXTS['level2']
         ),
         markup=await kb.get_level2_menu(
             level1_choice=callback_data.level1,
@@ -208,8 +217,8 @@ async def handle_level2(
     callback_data: cb.Level2Callback
 ):
     """Handler for Level 2 buttons. Representation for Level 3 buttons."""
-    category = await get_category(callback_data.category)
-    text = await aget_3level_or_default(BotMessage, 'level3', category.name)
+    category_name = await get_category_name(callback_data.category)
+    text = await aget_3level_or_default('level3', category_name)
     await edit_message(
         callback,
         text=text,
@@ -226,8 +235,8 @@ async def handle_paginate_level3(
     callback_data: cb.PaginateLevel3Callback
 ):
     """Handler for Level 2 buttons. Pagination for Level 3 buttons."""
-    category = await get_category(callback_data.level2)
-    text = await aget_3level_or_default(BotMessage, 'level3', category.name)
+    category_name = await get_category_name(callback_data.level2)
+    text = await aget_3level_or_default('level3', category_name)
     await edit_message(
         callback,
         text=text,
@@ -280,8 +289,8 @@ async def handle_paginate_content(
 async def handle_back_level1(callback: CallbackQuery):
     await edit_message(
         callback,
-        text=await aget_object_or_default(
-            BotMessage, 'level1', LEVEL_TEXTS['level1']
+        text=await aget_bot_message(
+            'level1', LEVEL_TEXTS['level1']
         ),
         markup=await kb.get_level1_menu()
     )
@@ -294,8 +303,8 @@ async def handle_back_level2(
 ):
     await edit_message(
         callback,
-        text=await aget_object_or_default(
-            BotMessage, 'level2', LEVEL_TEXTS['level2']
+        text=await aget_bot_message(
+            'level2', LEVEL_TEXTS['level2']
         ),
         markup=await kb.get_level2_menu(level1_choice=callback_data.level1)
     )
@@ -306,8 +315,8 @@ async def handle_back_level3(
     callback: CallbackQuery,
     callback_data: cb.BackLevel3Callback
 ):
-    category = await get_category(callback_data.level2)
-    text = await aget_3level_or_default(BotMessage, 'level3', category.name)
+    category_name = await get_category_name(callback_data.level2)
+    text = await aget_3level_or_default('level3', category_name)
     await edit_message(
         callback,
         text=text,
@@ -431,6 +440,14 @@ class SearchState(StatesGroup):
     waiting_for_query = State()
 
 
+def get_search_results_text(session) -> str:
+    if not session.results:
+        return SEARCH_NOT_FOUND_MSG
+    if session.is_global:
+        return SEARCH_GLOBAL_RESULTS_MSG.format(session.query)
+    return SEARCH_RESULTS_MSG.format(session.query)
+
+
 @router.message(SearchState.waiting_for_query)
 async def process_search_query(
     message: Message,
@@ -450,121 +467,69 @@ async def process_search_query(
             message_id=prompt_message_id
         )
     await message.delete()
-    filters = {
-        'is_active': True,
-        'name__icontains': search_query
-    }
-    content_items = await sync_to_async(list)(
-        ContentFile.objects.filter(**filters).distinct().values('name', 'id')
-    )
-    has_topics = await sync_to_async(lambda: Topic.objects.filter(
-        is_active=True,
-        files__is_active=True,
-        files__paths__id=level1_choice,
-        files__categories__id=level2_choice
-    ).exists())() if level2_choice else False
-    builder = InlineKeyboardBuilder()
-    if level3_choice:
-        back_callback = cb.Level3Callback(
-            level1=level1_choice,
-            level2=level2_choice,
-            topic=level3_choice
-        )
-    elif level2_choice and not has_topics:
-        back_callback = cb.Level3Callback(
-            level1=level1_choice,
-            level2=level2_choice,
-            topic=0
-        )
-    elif level2_choice:
-        back_callback = cb.Level2Callback(
-            level1=level1_choice,
-            category=level2_choice
-        )
-    else:
-        back_callback = cb.Level1Callback(choice=level1_choice)
-    if not content_items:
-        builder.add(InlineKeyboardButton(
-            text=SEARCH_REPEAT_BTN,
-            callback_data=cb.SearchCallback(
-                level1=level1_choice,
-                level2=level2_choice,
-                level3=level3_choice
-            ).pack()
-        ))
-        builder.add(InlineKeyboardButton(
-            text=BACK_BTN,
-            callback_data=back_callback.pack()
-        ))
-        builder.adjust(1)
-        await message.answer(
-            text=SEARCH_NOT_FOUND_MSG,
-            reply_markup=builder.as_markup(),
-            parse_mode='HTML'
-        )
-        await state.clear()
-        return
-    paginator = Paginator(content_items, kb.ITEMS_PER_PAGE)
-    current_page = paginator.get_page(1)
-    builder = InlineKeyboardBuilder()
-    for item in current_page.object_list:
-        builder.add(
-            InlineKeyboardButton(
-                text=item['name'],
-                callback_data=cb.ContentDescriptionCallback(
-                    level1=level1_choice,
-                    level2=level2_choice or 0,
-                    level3=level3_choice or 0,
-                    content_item=item['id']
-                ).pack()
-            )
-        )
-    builder.adjust(1)
-    if paginator.num_pages > 1:
-        pagination_row = []
-        if current_page.has_previous():
-            pagination_row.append(InlineKeyboardButton(
-                text=PREVIOUS_PAGE_BTN,
-                callback_data=cb.PaginateContentCallback(
-                    level1=level1_choice,
-                    level2=level2_choice or 0,
-                    level3=level3_choice or 0,
-                    page=current_page.previous_page_number()
-                ).pack()
-            ))
-        pagination_row.append(InlineKeyboardButton(
-            text=f'{current_page.number}/{paginator.num_pages}',
-            callback_data='no_action'
-        ))
-        if current_page.has_next():
-            pagination_row.append(InlineKeyboardButton(
-                text=NEXT_PAGE_BTN,
-                callback_data=cb.PaginateContentCallback(
-                    level1=level1_choice,
-                    level2=level2_choice or 0,
-                    level3=level3_choice or 0,
-                    page=current_page.next_page_number()
-                ).pack()
-            ))
-        builder.row(*pagination_row)
-    builder.row(InlineKeyboardButton(
-        text=SEARCH_REPEAT_BTN,
-        callback_data=cb.SearchCallback(
-            level1=level1_choice,
-            level2=level2_choice,
-            level3=level3_choice
-        ).pack()
-    ))
-    builder.row(InlineKeyboardButton(
-        text=BACK_BTN,
-        callback_data=back_callback.pack()
-    ))
+    session = await acreate_search_session(
+        search_query,
+        level1_choice,
+        level2_choice,
+        level3_choice
+    )
+    await state.clear()
     await message.answer(
-        text=SEARCH_RESULTS_MSG.format(search_query),
-        reply_markup=builder.as_markup(),
+        text=get_search_results_text(session),
+        reply_markup=await kb.get_search_results_menu(session),
         parse_mode='HTML'
     )
-    await state.clear()
+
+
+@router.callback_query(cb.PaginateSearchCallback.filter())
+async def handle_paginate_search(
+    callback: CallbackQuery,
+    callback_data: cb.PaginateSearchCallback
+):
+    """Page through stored search results without searching again."""
+    session = await aget_search_session(callback_data.token)
+    if session is None:
+        await callback.answer(SEARCH_EXPIRED_MSG, show_alert=True)
+        return
+    await edit_message(
+        callback,
+        text=get_search_results_text(session),
+        markup=await kb.get_search_results_menu(session, callback_data.page)
+    )
+
+
+@router.callback_query(cb.SearchGlobalCallback.filter())
+async def handle_search_global(
+    callback: CallbackQuery,
+    callback_data: cb.SearchGlobalCallback
+):
+    """Repeat a scoped search over the whole catalog."""
+    session = await aget_search_session(callback_data.token)
+    if session is None:
+        await callback.answer(SEARCH_EXPIRED_MSG, show_alert=True)
+        return
+    session = await acreate_search_session(
+        session.query,
+        session.level1,
+        session.level2,
+        session.level3,
+        is_global=True
+    )
+    await edit_message(
+        callback,
+        text=get_search_results_text(session),
+        markup=await kb.get_search_results_menu(session)
+    )
+
+
+@router.inline_query()
+async def inline_search(inline_query: InlineQuery, bot: Bot):
+    """Answer @bot queries from the in-memory name index."""
+    me = await bot.me()
+    await inline_query.answer(
+        await kb.get_inline_results(inline_query.query, me.username),
+        cache_time=INLINE_CACHE_TIME
+    )
 
 
 class RatingState(StatesGroup):
@@ -617,12 +582,10 @@ async def submit_rating(
     bot: Bot
 ):
     """Save the rating and return to the previous keyboard."""
-    user = await sync_to_async(
-        BotUser.objects.get
-    )(telegram_id=query.from_user.id)
-    await sync_to_async(ContentRating.objects.update_or_create)(
+    user_id = await aget_bot_user_id(query.from_user.id)
+    await db_sync_to_async(ContentRating.objects.update_or_create)(
         content_id=callback_data.content_id,
-        user=user,
+        user_id=user_id,
         defaults={'rating': callback_data.rating}
     )
     rating_reply_msg = await query.message.answer(
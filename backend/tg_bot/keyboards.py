@@ -1,15 +1,25 @@
 import os
 
-from aiogram.types import InlineKeyboardButton, WebAppInfo
+from aiogram.types import (
+    InlineKeyboardButton,
+    InlineKeyboardMarkup,
+    InlineQueryResultArticle,
+    InputTextMessageContent,
+    WebAppInfo
+)
+from aiogram.utils.deep_linking import create_deep_link
 from aiogram.utils.keyboard import InlineKeyboardBuilder
-from asgiref.sync import sync_to_async
-from django.core.paginator import Paginator
 
 import tg_bot.callbacks as cb
-from content.models import Category, ContentFile, Path, Topic
+from content.models import ContentFile
+from tg_bot.cache import cached_screen
+from tg_bot.catalog import aget_catalog
 from tg_bot.constants import (
     BACK_BTN,
+    CONTENT_START_PREFIX,
     DEFAULT_COLUMNS,
+    INLINE_OPEN_BTN,
+    INLINE_RESULTS_LIMIT,
     ITEMS_PER_PAGE,
     NEXT_PAGE_BTN,
     MAX_CHARS_PER_COLUMN,
@@ -17,19 +27,21 @@ from tg_bot.constants import (
     PREVIOUS_PAGE_BTN,
     RATING_BTN,
     SEARCH_BTN,
+    SEARCH_GLOBAL_BTN,
+    SEARCH_REPEAT_BTN,
     SHOW_ALL_BTN,
     TO_DESCRIPTION_BTN,
     TO_LIST_BTN
 )
+from tg_bot.db import db_sync_to_async, run_db
+from tg_bot.models import SearchSession
 
 
 async def get_level1_menu():
-    """Start menu (path). Load data from the database."""
+    """Start menu (path). Load data from the catalog snapshot."""
     builder = InlineKeyboardBuilder()
-    menu_items = await sync_to_async(list)(
-        Path.objects.all().values('name', 'id')
-    )
-    for item in menu_items:
+    catalog = await aget_catalog()
+    for item in catalog.paths:
         builder.add(
             InlineKeyboardButton(
                 text=item['name'],
@@ -40,39 +52,43 @@ async def get_level1_menu():
     return builder.as_markup()
 
 
-@sync_to_async
-def get_categories_page(
+def get_page_data(items: tuple, page: int, items_per_page: int) -> dict:
+    """Slice a page of a snapshot list ordered by (name, id).
+
+    Snapshot lists are immutable tuples, so the page count is fixed for
+    a catalog version and a page is found without counting or scanning.
+    """
+    num_pages = max(1, -(-len(items) // items_per_page))
+    page = min(max(page, 1), num_pages)
+    start = (page - 1) * items_per_page
+    return {
+        'items': items[start:start + items_per_page],
+        'current_page': page,
+        'num_pages': num_pages,
+        'has_previous': page > 1,
+        'has_next': page < num_pages,
+        'previous_page_number': page - 1 if page > 1 else None,
+        'next_page_number': page + 1 if page < num_pages else None,
+    }
+
+
+async def get_categories_page(
     level1_choice: int,
     page: int = 1,
     items_per_page: int = ITEMS_PER_PAGE
 ):
     """Get a page with categories."""
-    categories = Category.objects.filter(
-        is_active=True,
-        path__id=level1_choice
-    ).distinct().values('name', 'id')
-    paginator = Paginator(categories, items_per_page)
-    current_page = paginator.get_page(page)
+    catalog = await aget_catalog()
+    categories = catalog.get_categories(level1_choice)
+    page_data = get_page_data(categories, page, items_per_page)
     return {
-        'categories': list(current_page.object_list),
-        'current_page': page,
-        'num_pages': paginator.num_pages,
-        'has_previous': current_page.has_previous(),
-        'has_next': current_page.has_next(),
-        'previous_page_number': (
-            current_page.previous_page_number()
-            if current_page.has_previous()
-            else None
-        ),
-        'next_page_number': (
-            current_page.next_page_number()
-            if current_page.has_next()
-            else None
-        ),
+        'categories': list(page_data.pop('items')),
+        **page_data,
         'level1_choice': level1_choice
     }
 
 
+@cached_screen('level2')
 async def get_level2_menu(
     level1_choice: int,
     page: int = 1,
@@ -85,21 +101,13 @@ async def get_level2_menu(
     max_name_length = max((len(cat['name']) for cat in categories), default=0)
     columns = 1 if max_name_length > MAX_CHARS_PER_COLUMN else DEFAULT_COLUMNS
     for cat in categories:
-        has_topics = await sync_to_async(
-            lambda: Topic.objects.filter(
-                is_active=True,
-                files__is_active=True,
-                files__paths__id=level1_choice,
-                files__categories__id=cat['id']
-            ).exists()
-        )()
         callback_data = (
             cb.Level3Callback(
                 level1=level1_choice,
                 level2=cat['id'],
                 topic=0
             )
-            if not has_topics
+            if not cat['has_topics']
             else cb.Level2Callback(level1=level1_choice, category=cat['id'])
         )
         builder.add(
@@ -147,41 +155,23 @@ async def get_level2_menu(
     return builder.as_markup()
 
 
-@sync_to_async
-def get_level3_menu_data(
+async def get_level3_menu_data(
     level1_choice: int,
     level2_choice: int,
     page: int = 1,
     items_per_page: int = ITEMS_PER_PAGE
 ):
     """Get data for the Level 3 menu (topics)."""
-    topics = Topic.objects.filter(
-        is_active=True,
-        files__is_active=True,
-        files__paths__id=level1_choice,
-        files__categories__id=level2_choice,
-    ).distinct().values('name', 'id')
-    paginator = Paginator(topics, items_per_page)
-    current_page = paginator.get_page(page)
+    catalog = await aget_catalog()
+    topics = catalog.get_topics(level1_choice, level2_choice)
+    page_data = get_page_data(topics, page, items_per_page)
     return {
-        'topics': list(current_page.object_list),
-        'current_page': page,
-        'num_pages': paginator.num_pages,
-        'has_previous': current_page.has_previous(),
-        'has_next': current_page.has_next(),
-        'previous_page_number': (
-            current_page.previous_page_number()
-            if current_page.has_previous()
-            else None
-        ),
-        'next_page_number': (
-            current_page.next_page_number()
-            if current_page.has_next()
-            else None
-        ),
+        'topics': list(page_data.pop('items')),
+        **page_data,
     }
 
 
+@cached_screen('level3')
 async def get_level3_menu(
     level1_choice: int,
     level2_choice: int,
@@ -261,8 +251,7 @@ async def get_level3_menu(
     return builder.as_markup()
 
 
-@sync_to_async
-def get_content_menu_data(
+async def get_content_menu_data(
     level1_choice: int,
     level2_choice: int,
     level3_choice: int | None,
@@ -270,37 +259,20 @@ def get_content_menu_data(
     items_per_page: int = ITEMS_PER_PAGE
 ):
     """Get a list of content."""
-    filters = {
-        'is_active': True,
-        'paths__id': level1_choice,
-        'categories__id': level2_choice
-    }
-    if level3_choice:
-        filters['topics__id'] = level3_choice
-    content_items = ContentFile.objects.filter(
-        **filters
-    ).distinct().values('name', 'id')
-    paginator = Paginator(content_items, items_per_page)
-    current_page = paginator.get_page(page)
+    catalog = await aget_catalog()
+    content_items = catalog.get_content_items(
+        level1_choice,
+        level2_choice,
+        level3_choice
+    )
+    page_data = get_page_data(content_items, page, items_per_page)
     return {
-        'content_items': list(current_page.object_list),
-        'current_page': page,
-        'num_pages': paginator.num_pages,
-        'has_previous': current_page.has_previous(),
-        'has_next': current_page.has_next(),
-        'previous_page_number': (
-            current_page.previous_page_number()
-            if current_page.has_previous()
-            else None
-        ),
-        'next_page_number': (
-            current_page.next_page_number()
-            if current_page.has_next()
-            else None
-        ),
+        'content_items': list(page_data.pop('items')),
+        **page_data,
     }
 
 
+@cached_screen('content')
 async def get_content_menu(
     level1_choice: int,
     level2_choice: int,
@@ -358,17 +330,10 @@ async def get_content_menu(
                 ).pack()
             ))
         builder.row(*pagination_row)
-    has_topics = await sync_to_async(
-        lambda: Topic.objects.filter(
-            is_active=True,
-            files__is_active=True,
-            files__paths__id=level1_choice,
-            files__categories__id=level2_choice
-        ).exists()
-    )()
+    catalog = await aget_catalog()
     back_callback = (
         cb.BackLevel3Callback(level1=level1_choice, level2=level2_choice)
-        if has_topics
+        if catalog.has_topics(level1_choice, level2_choice)
         else cb.BackLevel2Callback(level1=level1_choice)
     )
     builder.row(InlineKeyboardButton(
@@ -388,7 +353,124 @@ async def get_content_menu(
     return builder.as_markup()
 
 
-@sync_to_async
+async def get_search_back_callback(
+    level1_choice: int,
+    level2_choice: int | None,
+    level3_choice: int | None
+):
+    """Callback returning from search to the screen it was started on."""
+    if level3_choice:
+        return cb.Level3Callback(
+            level1=level1_choice,
+            level2=level2_choice,
+            topic=level3_choice
+        )
+    if not level2_choice:
+        return cb.Level1Callback(choice=level1_choice)
+    catalog = await aget_catalog()
+    if catalog.has_topics(level1_choice, level2_choice):
+        return cb.Level2Callback(
+            level1=level1_choice,
+            category=level2_choice
+        )
+    return cb.Level3Callback(
+        level1=level1_choice,
+        level2=level2_choice,
+        topic=0
+    )
+
+
+async def get_search_results_menu(
+    session: SearchSession,
+    page: int = 1,
+    items_per_page: int = ITEMS_PER_PAGE
+):
+    """Page of stored search results with a button to widen the scope."""
+    page_data = get_page_data(session.results, page, items_per_page)
+    builder = InlineKeyboardBuilder()
+    for content_id, name in page_data['items']:
+        builder.add(InlineKeyboardButton(
+            text=name,
+            callback_data=cb.ContentDescriptionCallback(
+                level1=session.level1,
+                level2=session.level2 or 0,
+                level3=session.level3 or 0,
+                content_item=content_id
+            ).pack()
+        ))
+    builder.adjust(1)
+    if page_data['num_pages'] > 1:
+        pagination_row = []
+        if page_data['has_previous']:
+            pagination_row.append(InlineKeyboardButton(
+                text=PREVIOUS_PAGE_BTN,
+                callback_data=cb.PaginateSearchCallback(
+                    token=session.token,
+                    page=page_data['previous_page_number']
+                ).pack()
+            ))
+        pagination_row.append(InlineKeyboardButton(
+            text=f'{page_data['current_page']}/{page_data['num_pages']}',
+            callback_data='no_action'
+        ))
+        if page_data['has_next']:
+            pagination_row.append(InlineKeyboardButton(
+                text=NEXT_PAGE_BTN,
+                callback_data=cb.PaginateSearchCallback(
+                    token=session.token,
+                    page=page_data['next_page_number']
+                ).pack()
+            ))
+        builder.row(*pagination_row)
+    if not session.is_global:
+        builder.row(InlineKeyboardButton(
+            text=SEARCH_GLOBAL_BTN,
+            callback_data=cb.SearchGlobalCallback(token=session.token).pack()
+        ))
+    builder.row(InlineKeyboardButton(
+        text=SEARCH_REPEAT_BTN,
+        callback_data=cb.SearchCallback(
+            level1=session.level1,
+            level2=session.level2,
+            level3=session.level3
+        ).pack()
+    ))
+    back_callback = await get_search_back_callback(
+        session.level1, session.level2, session.level3
+    )
+    builder.row(InlineKeyboardButton(
+        text=BACK_BTN,
+        callback_data=back_callback.pack()
+    ))
+    return builder.as_markup()
+
+
+async def get_inline_results(query: str, bot_username: str) -> list:
+    """Inline query answers from the catalog name index."""
+    catalog = await aget_catalog()
+    return [
+        InlineQueryResultArticle(
+            id=str(item['id']),
+            title=item['name'],
+            input_message_content=InputTextMessageContent(
+                message_text=item['name']
+            ),
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
+                InlineKeyboardButton(
+                    text=INLINE_OPEN_BTN,
+                    url=create_deep_link(
+                        bot_username,
+                        'start',
+                        f'{CONTENT_START_PREFIX}{item["id"]}'
+                    )
+                )
+            ]])
+        )
+        for item in catalog.search_files(query, INLINE_RESULTS_LIMIT)
+    ]
+
+
+@db_sync_to_async
 def get_content_item_data(content_item_id: int) -> dict:
     """Get content item data by ID."""
     try:
@@ -408,7 +490,7 @@ def get_content_item_data(content_item_id: int) -> dict:
         }
 
 
-@sync_to_async
+@db_sync_to_async
 def get_media_file_data(content_item_id: int) -> dict:
     """Get media file data."""
     try:
@@ -422,7 +504,8 @@ def get_media_file_data(content_item_id: int) -> dict:
             'file_path': content_item.file.path,
             'file_name': content_item.file.name,
             'content_type': content_item.file_type,
-            'file_obj': content_item.file
+            'file_obj': content_item.file,
+            'telegram_file_id': content_item.telegram_file_id
         }
     except ContentFile.DoesNotExist:
         return {'error': 'Материал не найден'}
@@ -430,7 +513,20 @@ def get_media_file_data(content_item_id: int) -> dict:
         return {'error': f'Ошибка: {str(e)}'}
 
 
-@sync_to_async
+async def save_media_file_ids(
+    content_item_id: int,
+    file_id: str,
+    file_unique_id: str
+):
+    """Remember the Telegram copy of an uploaded media file."""
+    await run_db(
+        ContentFile.objects.filter(id=content_item_id).update,
+        telegram_file_id=file_id,
+        telegram_file_unique_id=file_unique_id
+    )
+
+
+@db_sync_to_async
 def get_content_page_data(
     content_item_id: int,
     page: int,
@@ -647,6 +743,7 @@ async def get_content_page(
     return content_text, builder.as_markup()
 
 
+@cached_screen('media_back')
 async def get_media_back_keyboard(
     level1_choice: int,
     level2_choice: int,
@@ -680,7 +777,8 @@ async def get_media_back_keyboard(
 
 async def get_link_data(link_item: int):
     try:
-        content_file = await ContentFile.objects.aget(
+        content_file = await run_db(
+            ContentFile.objects.get,
             id=link_item,
             file_type=ContentFile.FileType.LINK,
             is_active=True
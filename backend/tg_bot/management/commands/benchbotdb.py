@@ -0,0 +1,104 @@
+import asyncio
+import statistics
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+
+from content.models import ContentFile
+from tg_bot.db import run_db
+from users.models import BotUser
+
+
+BENCH_USERS = 50
+BENCH_REQUESTS = 20
+
+
+def handle_update(telegram_id: int, content_id: int | None):
+    """The queries a typical content screen makes for one update."""
+    BotUser.objects.filter(telegram_id=telegram_id).values_list(
+        'id', flat=True
+    ).first()
+    if content_id is not None:
+        ContentFile.objects.filter(id=content_id, is_active=True).values(
+            'name', 'description', 'file_type'
+        ).first()
+    return ContentFile.objects.filter(is_active=True).count()
+
+
+async def run_thread_sensitive(func, *args):
+    return await sync_to_async(func)(*args)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare bot DB throughput of sync_to_async and the bot DB pool '
+        'with concurrent users'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=BENCH_USERS,
+            help='Number of concurrent users',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=BENCH_REQUESTS,
+            help='Updates sent by each user',
+        )
+
+    def handle(self, *args, **options):
+        asyncio.run(self.main(
+            max(1, options['users']),
+            max(1, options['requests'])
+        ))
+
+    async def main(self, users, requests):
+        telegram_ids = await run_db(
+            lambda: list(BotUser.objects.values_list(
+                'telegram_id', flat=True
+            )[:users])
+        ) or [0]
+        content_ids = await run_db(
+            lambda: list(ContentFile.objects.filter(
+                is_active=True
+            ).values_list('id', flat=True)[:users])
+        ) or [None]
+        self.stdout.write(
+            f'Users: {users}, updates per user: {requests}'
+        )
+        for title, runner in (
+            ('sync_to_async', run_thread_sensitive),
+            ('run_db', run_db),
+        ):
+            elapsed, latencies = await self.bench(
+                runner, users, requests, telegram_ids, content_ids
+            )
+            total = users * requests
+            p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+            self.stdout.write(
+                f'{title:>14}: {total / elapsed:8.1f} updates/s, '
+                f'p50 {statistics.median(latencies) * 1000:.1f} ms, '
+                f'p95 {p95:.1f} ms'
+            )
+
+    async def bench(self, runner, users, requests, telegram_ids, content_ids):
+        latencies = []
+
+        async def user(number):
+            telegram_id = telegram_ids[number % len(telegram_ids)]
+            for i in range(requests):
+                started = time.monotonic()
+                await runner(
+                    handle_update,
+                    telegram_id,
+                    content_ids[(number + i) % len(content_ids)]
+                )
+                latencies.append(time.monotonic() - started)
+
+        started = time.monotonic()
+        await asyncio.gather(*(user(number) for number in range(users)))
+        return time.monotonic() - started, latencies
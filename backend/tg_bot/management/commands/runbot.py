@@ -1,12 +1,32 @@
 import asyncio
 import logging
+import signal
 
 from aiogram import Bot, Dispatcher
-from django.core.management.base import BaseCommand
+from aiogram.webhook.aiohttp_server import (
+    SimpleRequestHandler,
+    setup_application
+)
+from aiohttp import web
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
 
+from tg_bot.broadcast import start_broadcasts
+from tg_bot.buffers import (
+    content_view_buffer,
+    start_view_partitions,
+    user_activity_buffer
+)
+from tg_bot.cache import bot_user_ids, keyboard_cache
+from tg_bot.catalog import on_catalog_changed
+from tg_bot.constants import WEBHOOK_HOST, WEBHOOK_PORT
+from tg_bot.db import get_pool_stats, start_pool_stats_logging
 from tg_bot.handlers import router
+from tg_bot.messages import on_bot_message_changed
 from tg_bot.middleware import ContentStatMiddleware, UserActivityMiddleware
+from tg_bot.notify import BOT_MESSAGE_CHANNEL, CATALOG_CHANNEL, listen
+from tg_bot.search import search_stats, start_search_cleanup
+from tg_bot.storage import DjangoStorage, start_fsm_cleanup
 from tg_bot.utils import start_reminders_scheduler
 
 
@@ -19,6 +39,31 @@ class Command(BaseCommand):
             type=str,
             help='Telegram bot token (takes priority over variables)',
         )
+        parser.add_argument(
+            '--webhook',
+            action='store_true',
+            help='Receive updates through a webhook instead of polling',
+        )
+        parser.add_argument(
+            '--host',
+            type=str,
+            default=WEBHOOK_HOST,
+            help='Webhook server host',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=WEBHOOK_PORT,
+            help='Webhook server port (shared by all worker processes)',
+        )
+        parser.add_argument(
+            '--no-scheduler',
+            action='store_true',
+            help=(
+                'Do not send reminders and broadcasts or create view '
+                'partitions from this process'
+            ),
+        )
 
     def handle(self, *args, **options):
         logging.basicConfig(level=logging.INFO)
@@ -31,7 +76,7 @@ class Command(BaseCommand):
                     '❌ Bot token not found. '
                     'Enter token using one of the methods:\n'
                     '   - Command argument --token <token>\n'
-                    '   - Via enviromental variable TELEGRAM_BOT_TOKEN'
+                    '   - Via environment variable TELEGRAM_BOT_TOKEN'
                 )
             )
             return
@@ -40,21 +85,92 @@ class Command(BaseCommand):
             self.style.SUCCESS(f'Starting bot with token: {token[:10]}...')
         )
 
+        if options['webhook'] and not settings.TELEGRAM_WEBHOOK_URL:
+            raise CommandError(
+                'Webhook URL not found. '
+                'Set environment variable TELEGRAM_WEBHOOK_URL'
+            )
+
+        if options['webhook'] and not settings.TELEGRAM_WEBHOOK_SECRET:
+            raise CommandError(
+                'Webhook secret not found. '
+                'Set environment variable TELEGRAM_WEBHOOK_SECRET'
+            )
+
         try:
-            asyncio.run(self.main(token))
+            asyncio.run(self.main(token, options))
         except KeyboardInterrupt:
             self.stdout.write(self.style.WARNING('🛑 Aborted by user'))
         except Exception as e:
             self.stderr.write(self.style.ERROR(f'❌ Error: {e}'))
 
-    async def main(self, token):
+    async def main(self, token, options):
         bot = Bot(token=token)
-        dp = Dispatcher()
+        dp = Dispatcher(storage=DjangoStorage())
         dp.include_router(router)
         dp.update.middleware(UserActivityMiddleware())
         dp.callback_query.middleware(ContentStatMiddleware())
-        asyncio.create_task(start_reminders_scheduler(bot))
+        if not options['no_scheduler']:
+            asyncio.create_task(start_reminders_scheduler(bot))
+            asyncio.create_task(start_broadcasts(bot))
+            asyncio.create_task(start_view_partitions())
+        asyncio.create_task(start_fsm_cleanup())
+        asyncio.create_task(start_search_cleanup())
+        asyncio.create_task(user_activity_buffer.run())
+        asyncio.create_task(content_view_buffer.run())
+        asyncio.create_task(start_pool_stats_logging())
+        dp.shutdown.register(user_activity_buffer.flush)
+        dp.shutdown.register(content_view_buffer.flush)
+        asyncio.create_task(listen({
+            BOT_MESSAGE_CHANNEL: on_bot_message_changed,
+            CATALOG_CHANNEL: on_catalog_changed,
+        }))
 
         self.stdout.write(self.style.SUCCESS('✅ Bot started!'))
 
-        await dp.start_polling(bot)
+        try:
+            if options['webhook']:
+                await self.run_webhook(
+                    bot, dp, options['host'], options['port']
+                )
+            else:
+                await dp.start_polling(bot)
+        finally:
+            logging.info('Keyboard cache: %s', keyboard_cache.stats())
+            logging.info('Bot user id cache: %s', bot_user_ids.stats())
+            logging.info('DB pool: %s', get_pool_stats())
+            logging.info('Search: %s', search_stats.stats())
+
+    async def run_webhook(self, bot, dp, host, port):
+        """Serve updates over HTTP until SIGINT/SIGTERM."""
+        app = web.Application()
+        SimpleRequestHandler(
+            dispatcher=dp,
+            bot=bot,
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET
+        ).register(app, path=settings.TELEGRAM_WEBHOOK_PATH)
+        setup_application(app, dp, bot=bot)
+        await bot.set_webhook(
+            url=(
+                settings.TELEGRAM_WEBHOOK_URL.rstrip('/')
+                + settings.TELEGRAM_WEBHOOK_PATH
+            ),
+            secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+            allowed_updates=dp.resolve_used_update_types()
+        )
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, host, port, reuse_port=True).start()
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Webhook server on {host}:{port}')
+        )
+        try:
+            await stop.wait()
+        finally:
+            await runner.cleanup()
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import defaultdict
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.types import FSInputFile
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from content.models import ContentFile
+from tg_bot.constants import (
+    MEDIA_SEND_METHODS,
+    WARM_MEDIA_CONCURRENCY,
+    WARM_MEDIA_RETRIES
+)
+from tg_bot.utils import get_sent_file_ids
+
+
+def get_file_hash(file_path: str) -> str:
+    """SHA-256 of a file on disk."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@sync_to_async
+def get_pending_files() -> list:
+    """Active media files that have no Telegram copy yet."""
+    return list(
+        ContentFile.objects.filter(
+            is_active=True,
+            file_type__in=MEDIA_SEND_METHODS,
+            telegram_file_id=''
+        ).exclude(file='').exclude(file__isnull=True)
+    )
+
+
+@sync_to_async
+def get_known_hashes() -> dict:
+    """Telegram ids already known for a file hash and type.
+
+    A file_id only works with the send method it was uploaded with, so
+    the same bytes stored as another type are not reused.
+    """
+    return {
+        (file_hash, file_type): (file_id, file_unique_id)
+        for (
+            file_hash, file_type, file_id, file_unique_id
+        ) in ContentFile.objects.exclude(
+            file_hash=''
+        ).exclude(
+            telegram_file_id=''
+        ).values_list(
+            'file_hash',
+            'file_type',
+            'telegram_file_id',
+            'telegram_file_unique_id'
+        )
+    }
+
+
+class Command(BaseCommand):
+    help = 'Upload active media files once to cache their Telegram file_ids'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--token',
+            type=str,
+            help='Telegram bot token (takes priority over variables)',
+        )
+        parser.add_argument(
+            '--chat-id',
+            type=str,
+            help='Storage chat for uploads (TELEGRAM_STORAGE_CHAT_ID)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=WARM_MEDIA_CONCURRENCY,
+            help='Number of parallel uploads',
+        )
+        parser.add_argument(
+            '--api-url',
+            type=str,
+            help='Bot API server base URL (TELEGRAM_API_URL)',
+        )
+
+    def handle(self, *args, **options):
+        token = options.get('token') or settings.TELEGRAM_BOT_TOKEN
+        chat_id = options.get('chat_id') or settings.TELEGRAM_STORAGE_CHAT_ID
+        if not token or not chat_id:
+            self.stderr.write(
+                self.style.ERROR(
+                    '❌ Bot token or storage chat not found. Use --token and '
+                    '--chat-id or TELEGRAM_BOT_TOKEN and '
+                    'TELEGRAM_STORAGE_CHAT_ID'
+                )
+            )
+            return
+        try:
+            asyncio.run(self.main(
+                token,
+                chat_id,
+                max(1, options['concurrency']),
+                options.get('api_url') or settings.TELEGRAM_API_URL
+            ))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('🛑 Aborted by user'))
+
+    async def main(self, token, chat_id, concurrency, api_url):
+        session = (
+            AiohttpSession(api=TelegramAPIServer.from_base(api_url))
+            if api_url
+            else None
+        )
+        bot = Bot(token=token, session=session)
+        self.stats = {'uploaded': 0, 'reused': 0, 'failed': 0, 'bytes': 0}
+        self.known_hashes = await get_known_hashes()
+        self.upload_locks = defaultdict(asyncio.Lock)
+        semaphore = asyncio.Semaphore(concurrency)
+        pending = await get_pending_files()
+        self.stdout.write(f'Files to warm: {len(pending)}')
+        started = time.monotonic()
+        try:
+            await asyncio.gather(*(
+                self.warm_file(bot, chat_id, content_file, semaphore)
+                for content_file in pending
+            ))
+        finally:
+            await bot.session.close()
+        elapsed = time.monotonic() - started
+        megabytes = self.stats['bytes'] / 1024 / 1024
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Uploaded: {self.stats["uploaded"]}, '
+            f'reused by hash: {self.stats["reused"]}, '
+            f'failed: {self.stats["failed"]} in {elapsed:.1f}s '
+            f'({self.stats["uploaded"] / elapsed if elapsed else 0:.2f} '
+            f'files/s, {megabytes / elapsed if elapsed else 0:.2f} MB/s)'
+        ))
+
+    async def warm_file(self, bot, chat_id, content_file, semaphore):
+        async with semaphore:
+            try:
+                file_path = content_file.file.path
+                file_hash = await asyncio.to_thread(get_file_hash, file_path)
+                key = (file_hash, content_file.file_type)
+                async with self.upload_locks[key]:
+                    file_ids = self.known_hashes.get(key)
+                    if file_ids:
+                        self.stats['reused'] += 1
+                    else:
+                        file_ids = await self.upload(
+                            bot, chat_id, content_file, file_path
+                        )
+                        self.known_hashes[key] = file_ids
+                        self.stats['uploaded'] += 1
+                        self.stats['bytes'] += os.path.getsize(file_path)
+                await ContentFile.objects.filter(
+                    id=content_file.id
+                ).aupdate(
+                    telegram_file_id=file_ids[0],
+                    telegram_file_unique_id=file_ids[1],
+                    file_hash=file_hash
+                )
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.stderr.write(f'❌ {content_file.name}: {e}')
+
+    async def upload(self, bot, chat_id, content_file, file_path):
+        method_name, field = MEDIA_SEND_METHODS[content_file.file_type]
+        for attempt in range(WARM_MEDIA_RETRIES):
+            try:
+                message = await getattr(bot, method_name)(
+                    chat_id=chat_id,
+                    caption=content_file.name,
+                    **{field: FSInputFile(file_path)}
+                )
+                break
+            except TelegramRetryAfter as e:
+                if attempt == WARM_MEDIA_RETRIES - 1:
+                    raise
+                await asyncio.sleep(e.retry_after)
+        file_ids = get_sent_file_ids(message)
+        if not file_ids:
+            raise ValueError('Telegram returned no file')
+        return file_ids
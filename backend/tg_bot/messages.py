@@ -0,0 +1,40 @@
+from tg_bot.db import db_sync_to_async
+from tg_bot.models import BotMessage
+
+
+_texts = None
+
+
+def load_bot_messages():
+    """Load all bot message texts into memory."""
+    global _texts
+    _texts = dict(BotMessage.objects.values_list('key', 'text'))
+
+
+def reload_bot_message(key: str):
+    """Refresh a single text after it was changed or deleted."""
+    if _texts is None:
+        load_bot_messages()
+        return
+    text = BotMessage.objects.filter(
+        key=key
+    ).values_list('text', flat=True).first()
+    if text is None:
+        _texts.pop(key, None)
+    else:
+        _texts[key] = text
+
+
+async def on_bot_message_changed(key: str | None):
+    """NOTIFY handler: reload the changed key, or everything if unknown."""
+    if key is None:
+        await db_sync_to_async(load_bot_messages)()
+    else:
+        await db_sync_to_async(reload_bot_message)(key)
+
+
+async def aget_bot_message(key: str, default: str) -> str:
+    """Get a message text from memory."""
+    if _texts is None:
+        await db_sync_to_async(load_bot_messages)()
+    return _texts.get(key, default)
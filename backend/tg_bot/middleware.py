@@ -2,11 +2,8 @@ from typing import Any, Awaitable, Callable, Dict
 
 from aiogram import BaseMiddleware
 from aiogram.types import CallbackQuery, Update
-from asgiref.sync import sync_to_async
-from django.utils import timezone
 
-from content.models import ContentFile, ContentViewStat
-from users.models import BotUser
+from tg_bot.buffers import content_view_buffer, user_activity_buffer
 
 
 class UserActivityMiddleware(BaseMiddleware):
@@ -18,34 +15,18 @@ class UserActivityMiddleware(BaseMiddleware):
             user = event.message.from_user
         elif event.callback_query:
             user = event.callback_query.from_user
+        elif event.inline_query:
+            user_activity_buffer.seen(event.inline_query.from_user)
         if user:
             await self.create_or_update_user(user)
         return await handler(event, data)
 
-    @sync_to_async
-    def create_or_update_user(self, tg_user):
-        """Creates or updates a user."""
+    async def create_or_update_user(self, tg_user):
+        """Creates or updates a user through the write-behind buffer."""
         try:
-            user, created = BotUser.objects.get_or_create(
-                telegram_id=tg_user.id,
-                defaults={
-                    'username': tg_user.username or '',
-                    'first_name': tg_user.first_name or '',
-                    'last_active': timezone.now(),
-                    'is_active': True
-                }
-            )
-            if not created:
-                user.last_active = timezone.now()
-                if user.first_name != (tg_user.first_name or ''):
-                    user.first_name = tg_user.first_name or ''
-                if user.username != (tg_user.username or ''):
-                    user.username = tg_user.username or ''
-                user.save()
-            return user
-
-        except Exception:
-            return None
+            await user_activity_buffer.touch(tg_user)
+        except Exception as e:
+            print(f'Ошибка регистрации пользователя: {e}')
 
 
 class ContentStatMiddleware(BaseMiddleware):
@@ -95,14 +76,10 @@ class ContentStatMiddleware(BaseMiddleware):
         except Exception as e:
             print(f"Ошибка в ContentStatMiddleware: {e}")
 
-    @sync_to_async
-    def record_content_stat(self, tg_user, content_item_id, callback_type):
-        try:
-            user = BotUser.objects.get(telegram_id=tg_user.id)
-            content_file = ContentFile.objects.get(id=content_item_id)
-            ContentViewStat.objects.create(
-                user=user,
-                content_file=content_file,
-            )
-        except Exception as e:
-            print(f"Ошибка записи статистики: {e}")
+    async def record_content_stat(
+        self,
+        tg_user,
+        content_item_id,
+        callback_type
+    ):
+        content_view_buffer.record(tg_user.id, content_item_id)
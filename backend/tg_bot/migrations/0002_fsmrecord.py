@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tg_bot', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FSMRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='storage key')),
+                ('state', models.CharField(blank=True, max_length=255, null=True, verbose_name='state')),
+                ('data', models.JSONField(default=dict, verbose_name='data')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Expiration time')),
+            ],
+            options={
+                'verbose_name': 'FSM record',
+                'verbose_name_plural': 'FSM records',
+            },
+        ),
+    ]
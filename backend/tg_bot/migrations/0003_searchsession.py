@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tg_bot', '0002_fsmrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=16, unique=True, verbose_name='token')),
+                ('query', models.CharField(max_length=255, verbose_name='query')),
+                ('level1', models.IntegerField(verbose_name='path')),
+                ('level2', models.IntegerField(null=True, verbose_name='category')),
+                ('level3', models.IntegerField(null=True, verbose_name='topic')),
+                ('results', models.JSONField(default=list, verbose_name='results (id, name)')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Expiration time')),
+            ],
+            options={
+                'verbose_name': 'search session',
+                'verbose_name_plural': 'Search sessions',
+            },
+        ),
+    ]
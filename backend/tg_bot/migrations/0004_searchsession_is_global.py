@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tg_bot', '0003_searchsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchsession',
+            name='is_global',
+            field=models.BooleanField(default=False, verbose_name='search the whole catalog'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tg_bot', '0004_searchsession_is_global'),
+        ('users', '0005_botuser_activity_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Broadcast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.TextField(verbose_name='message text')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('CANCELLED', 'Cancelled')], db_index=True, default='PENDING', max_length=16, verbose_name='status')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='recipients')),
+                ('sent', models.PositiveIntegerField(default=0, verbose_name='sent')),
+                ('blocked', models.PositiveIntegerField(default=0, verbose_name='blocked')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='failed')),
+                ('unknown', models.PositiveIntegerField(default=0, verbose_name='interrupted while sending')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('started_at', models.DateTimeField(null=True, verbose_name='Started')),
+                ('finished_at', models.DateTimeField(null=True, verbose_name='Finished')),
+            ],
+            options={
+                'verbose_name': 'broadcast',
+                'verbose_name_plural': 'Broadcasts',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='number')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('CLAIMED', 'Claimed'), ('DONE', 'Done')], default='PENDING', max_length=16, verbose_name='status')),
+                ('claimed_at', models.DateTimeField(null=True, verbose_name='Claimed')),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='tg_bot.broadcast', verbose_name='broadcast')),
+            ],
+            options={
+                'verbose_name': 'broadcast batch',
+                'verbose_name_plural': 'Broadcast batches',
+            },
+        ),
+        migrations.CreateModel(
+            name='BroadcastRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('BLOCKED', 'Blocked the bot'), ('FAILED', 'Failed'), ('UNKNOWN', 'Interrupted while sending')], default='PENDING', max_length=16, verbose_name='status')),
+                ('sent_at', models.DateTimeField(null=True, verbose_name='Sent')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='tg_bot.broadcastbatch', verbose_name='batch')),
+                ('broadcast', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='tg_bot.broadcast', verbose_name='broadcast')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='broadcasts', to='users.botuser', verbose_name='user')),
+            ],
+            options={
+                'verbose_name': 'broadcast recipient',
+                'verbose_name_plural': 'Broadcast recipients',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='broadcastbatch',
+            index=models.Index(fields=['status', 'broadcast', 'number'], name='broadcast_batch_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='broadcastbatch',
+            constraint=models.UniqueConstraint(fields=('broadcast', 'number'), name='unique_broadcast_batch'),
+        ),
+        migrations.AddConstraint(
+            model_name='broadcastrecipient',
+            constraint=models.UniqueConstraint(fields=('broadcast', 'user'), name='unique_broadcast_recipient'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tg_bot', '0005_broadcast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='broadcastbatch',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=32, verbose_name='worker'),
+        ),
+    ]
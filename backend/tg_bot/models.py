@@ -1,5 +1,7 @@
 from django.db import models
 
+from users.models import BotUser
+
 
 class BotMessage(models.Model):
     """Bot messages."""
@@ -27,3 +29,208 @@ class BotMessage(models.Model):
 
     def __str__(self):
         return self.key
+
+
+class FSMRecord(models.Model):
+    """State and data of a bot conversation shared by all bot workers."""
+
+    key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='storage key'
+    )
+    state = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        verbose_name='state'
+    )
+    data = models.JSONField(default=dict, verbose_name='data')
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Expiration time'
+    )
+
+    class Meta:
+        verbose_name = 'FSM record'
+        verbose_name_plural = 'FSM records'
+
+    def __str__(self):
+        return self.key
+
+
+class SearchSession(models.Model):
+    """Ordered search results paged by a short token."""
+
+    token = models.CharField(
+        max_length=16,
+        unique=True,
+        verbose_name='token'
+    )
+    query = models.CharField(max_length=255, verbose_name='query')
+    level1 = models.IntegerField(verbose_name='path')
+    level2 = models.IntegerField(null=True, verbose_name='category')
+    level3 = models.IntegerField(null=True, verbose_name='topic')
+    is_global = models.BooleanField(
+        default=False,
+        verbose_name='search the whole catalog'
+    )
+    results = models.JSONField(
+        default=list,
+        verbose_name='results (id, name)'
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name='Expiration time'
+    )
+
+    class Meta:
+        verbose_name = 'search session'
+        verbose_name_plural = 'Search sessions'
+
+    def __str__(self):
+        return self.query
+
+
+class Broadcast(models.Model):
+    """Announcement sent to all active bot users."""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        CANCELLED = 'CANCELLED', 'Cancelled'
+
+    text = models.TextField(verbose_name='message text')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+        verbose_name='status'
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name='recipients')
+    sent = models.PositiveIntegerField(default=0, verbose_name='sent')
+    blocked = models.PositiveIntegerField(default=0, verbose_name='blocked')
+    failed = models.PositiveIntegerField(default=0, verbose_name='failed')
+    unknown = models.PositiveIntegerField(
+        default=0,
+        verbose_name='interrupted while sending'
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Created'
+    )
+    started_at = models.DateTimeField(null=True, verbose_name='Started')
+    finished_at = models.DateTimeField(null=True, verbose_name='Finished')
+
+    class Meta:
+        verbose_name = 'broadcast'
+        verbose_name_plural = 'Broadcasts'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.created_at:%Y-%m-%d %H:%M} ({self.status})'
+
+    @property
+    def processed(self) -> int:
+        return self.sent + self.blocked + self.failed + self.unknown
+
+
+class BroadcastBatch(models.Model):
+    """Part of the recipients of a broadcast claimed by one worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        CLAIMED = 'CLAIMED', 'Claimed'
+        DONE = 'DONE', 'Done'
+
+    broadcast = models.ForeignKey(
+        Broadcast,
+        on_delete=models.CASCADE,
+        related_name='batches',
+        verbose_name='broadcast'
+    )
+    number = models.PositiveIntegerField(verbose_name='number')
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='status'
+    )
+    claimed_by = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name='worker'
+    )
+    claimed_at = models.DateTimeField(null=True, verbose_name='Claimed')
+
+    class Meta:
+        verbose_name = 'broadcast batch'
+        verbose_name_plural = 'Broadcast batches'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['broadcast', 'number'],
+                name='unique_broadcast_batch'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['status', 'broadcast', 'number'],
+                name='broadcast_batch_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.broadcast_id}/{self.number}'
+
+
+class BroadcastRecipient(models.Model):
+    """Delivery status of a broadcast for one user."""
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        BLOCKED = 'BLOCKED', 'Blocked the bot'
+        FAILED = 'FAILED', 'Failed'
+        UNKNOWN = 'UNKNOWN', 'Interrupted while sending'
+
+    broadcast = models.ForeignKey(
+        Broadcast,
+        on_delete=models.CASCADE,
+        related_name='recipients',
+        verbose_name='broadcast'
+    )
+    batch = models.ForeignKey(
+        BroadcastBatch,
+        on_delete=models.CASCADE,
+        related_name='recipients',
+        verbose_name='batch'
+    )
+    user = models.ForeignKey(
+        BotUser,
+        on_delete=models.CASCADE,
+        related_name='broadcasts',
+        verbose_name='user'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='status'
+    )
+    sent_at = models.DateTimeField(null=True, verbose_name='Sent')
+
+    class Meta:
+        verbose_name = 'broadcast recipient'
+        verbose_name_plural = 'Broadcast recipients'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['broadcast', 'user'],
+                name='unique_broadcast_recipient'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} ({self.status})'
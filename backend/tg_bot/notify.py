@@ -0,0 +1,61 @@
+import asyncio
+import logging
+
+import psycopg
+from django.conf import settings
+from django.db import connection, transaction
+
+from tg_bot.constants import NOTIFY_RECONNECT_DELAY
+
+
+BOT_MESSAGE_CHANNEL = 'bot_message_changed'
+CATALOG_CHANNEL = 'catalog_changed'
+
+logger = logging.getLogger(__name__)
+
+
+def publish(channel: str, payload: str = ''):
+    """Send a Postgres NOTIFY once the current transaction commits."""
+    if connection.vendor != 'postgresql':
+        return
+
+    def send():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [channel, payload])
+    transaction.on_commit(send)
+
+
+def get_conninfo() -> dict:
+    database = settings.DATABASES['default']
+    return {
+        'dbname': database['NAME'],
+        'user': database['USER'],
+        'password': database['PASSWORD'],
+        'host': database['HOST'],
+        'port': database['PORT'],
+    }
+
+
+async def listen(handlers: dict):
+    """Dispatch NOTIFY payloads to async handlers, reconnecting forever.
+
+    After every (re)connect each handler is called with None, since
+    notifications sent while disconnected are lost.
+    """
+    while True:
+        try:
+            async with await psycopg.AsyncConnection.connect(
+                **get_conninfo(),
+                autocommit=True
+            ) as conn:
+                for channel in handlers:
+                    await conn.execute(f'LISTEN {channel}')
+                for handler in handlers.values():
+                    await handler(None)
+                async for notify in conn.notifies():
+                    await handlers[notify.channel](notify.payload or None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning('Listener disconnected: %s', e)
+        await asyncio.sleep(NOTIFY_RECONNECT_DELAY)
@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import secrets
+import threading
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from content.constants import SEARCH_RESULTS_LIMIT
+from content.models import ContentFile
+from tg_bot.cache import LRUCache
+from tg_bot.constants import (
+    SEARCH_CLEANUP_PERIOD,
+    SEARCH_SESSION_CACHE_SIZE,
+    SEARCH_SESSION_TTL,
+    SEARCH_TOKEN_BYTES
+)
+from tg_bot.db import db_sync_to_async, run_db
+from tg_bot.models import SearchSession
+
+
+logger = logging.getLogger(__name__)
+
+search_sessions = LRUCache(SEARCH_SESSION_CACHE_SIZE)
+
+
+class SearchStats:
+    """Number of searches, results and query time per scope."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scopes = {}
+
+    def record(self, scope: str, results: int, elapsed: float):
+        with self._lock:
+            stats = self._scopes.setdefault(
+                scope, {'searches': 0, 'results': 0, 'time_ms': 0.0}
+            )
+            stats['searches'] += 1
+            stats['results'] += results
+            stats['time_ms'] += elapsed * 1000
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                scope: {
+                    **stats,
+                    'avg_results': stats['results'] / stats['searches'],
+                    'avg_time_ms': stats['time_ms'] / stats['searches'],
+                }
+                for scope, stats in self._scopes.items()
+            }
+
+
+search_stats = SearchStats()
+
+
+def get_search_scope(
+    level1: int,
+    level2: int | None,
+    level3: int | None,
+    is_global: bool = False
+) -> tuple[str, dict]:
+    """Scope name and ContentFile filters for the screen of a search."""
+    if is_global:
+        return 'global', {}
+    filters = {'paths': level1}
+    if not level2:
+        return 'path', filters
+    filters['categories'] = level2
+    if not level3:
+        return 'category', filters
+    filters['topics'] = level3
+    return 'topic', filters
+
+
+def create_search_session(
+    query: str,
+    level1: int,
+    level2: int | None,
+    level3: int | None,
+    is_global: bool = False
+) -> SearchSession:
+    """Run the search once within its scope and store the ordered results."""
+    scope, filters = get_search_scope(level1, level2, level3, is_global)
+    started = time.monotonic()
+    results = [
+        [content_id, name]
+        for content_id, name in ContentFile.objects.filter(
+            is_active=True,
+            **filters
+        ).search(query).values_list('id', 'name')[:SEARCH_RESULTS_LIMIT]
+    ]
+    elapsed = time.monotonic() - started
+    search_stats.record(scope, len(results), elapsed)
+    logger.info(
+        'Search scope=%s results=%d time=%.1fms',
+        scope, len(results), elapsed * 1000
+    )
+    return SearchSession.objects.create(
+        token=secrets.token_urlsafe(SEARCH_TOKEN_BYTES),
+        query=query[:SearchSession._meta.get_field('query').max_length],
+        level1=level1,
+        level2=level2,
+        level3=level3,
+        is_global=is_global,
+        results=results,
+        expires_at=timezone.now() + timedelta(seconds=SEARCH_SESSION_TTL)
+    )
+
+
+async def acreate_search_session(
+    query: str,
+    level1: int,
+    level2: int | None,
+    level3: int | None,
+    is_global: bool = False
+) -> SearchSession:
+    session = await db_sync_to_async(create_search_session)(
+        query, level1, level2, level3, is_global
+    )
+    search_sessions.set(session.token, session)
+    return session
+
+
+async def aget_search_session(token: str) -> SearchSession | None:
+    """Session by token, from memory when this worker created it."""
+    session = search_sessions.get(token)
+    if session is None:
+        session = await run_db(
+            SearchSession.objects.filter(token=token).first
+        )
+        if session is None:
+            return None
+        search_sessions.set(token, session)
+    if session.expires_at <= timezone.now():
+        search_sessions.pop(token)
+        return None
+    return session
+
+
+def delete_expired_search_sessions() -> int:
+    deleted, _ = SearchSession.objects.filter(
+        expires_at__lte=timezone.now()
+    ).delete()
+    return deleted
+
+
+async def start_search_cleanup():
+    """Periodically delete expired search sessions."""
+    while True:
+        try:
+            await db_sync_to_async(delete_expired_search_sessions)()
+        except Exception as e:
+            print(f'Ошибка очистки результатов поиска: {e}')
+        await asyncio.sleep(SEARCH_CLEANUP_PERIOD)
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save
+)
+from django.dispatch import receiver
+
+from content.models import Category, ContentFile, Path, Topic
+from tg_bot.catalog import invalidate_catalog
+from tg_bot.models import BotMessage
+from tg_bot.notify import BOT_MESSAGE_CHANNEL, CATALOG_CHANNEL, publish
+
+
+@receiver(post_save, sender=Path)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Topic)
+@receiver(post_save, sender=ContentFile)
+@receiver(post_delete, sender=Path)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=ContentFile)
+@receiver(m2m_changed, sender=ContentFile.paths.through)
+@receiver(m2m_changed, sender=ContentFile.categories.through)
+@receiver(m2m_changed, sender=ContentFile.topics.through)
+def catalog_changed(sender, **kwargs):
+    """Rebuild the navigation snapshot once the change is committed."""
+    transaction.on_commit(invalidate_catalog)
+    publish(CATALOG_CHANNEL)
+
+
+@receiver(pre_save, sender=BotMessage)
+def remember_bot_message_key(sender, instance, **kwargs):
+    """Keep the previous key so a renamed message is reloaded too."""
+    if instance.pk:
+        instance._previous_key = BotMessage.objects.filter(
+            pk=instance.pk
+        ).values_list('key', flat=True).first()
+
+
+@receiver(post_save, sender=BotMessage)
+@receiver(post_delete, sender=BotMessage)
+def bot_message_changed(sender, instance, **kwargs):
+    """Tell every bot process to reload the changed text."""
+    publish(BOT_MESSAGE_CHANNEL, instance.key)
+    previous_key = getattr(instance, '_previous_key', None)
+    if previous_key and previous_key != instance.key:
+        publish(BOT_MESSAGE_CHANNEL, previous_key)
@@ -0,0 +1,163 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, Mapping, Optional
+from weakref import WeakValueDictionary
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import (
+    BaseStorage,
+    DefaultKeyBuilder,
+    KeyBuilder,
+    StateType,
+    StorageKey
+)
+from django.db import transaction
+from django.utils import timezone
+
+from tg_bot.constants import (
+    FSM_CLEANUP_BATCH_SIZE,
+    FSM_CLEANUP_PERIOD,
+    FSM_TTL
+)
+from tg_bot.db import db_sync_to_async
+from tg_bot.models import FSMRecord
+
+
+def upsert_record(key: str, ttl: int, **fields):
+    """Insert a record or update the given fields of an existing one."""
+    FSMRecord.objects.filter(
+        key=key,
+        expires_at__lte=timezone.now()
+    ).delete()
+    FSMRecord.objects.bulk_create(
+        [FSMRecord(
+            key=key,
+            expires_at=timezone.now() + timedelta(seconds=ttl),
+            **fields
+        )],
+        update_conflicts=True,
+        unique_fields=['key'],
+        update_fields=[*fields, 'expires_at']
+    )
+
+
+def get_record_field(key: str, field: str):
+    return FSMRecord.objects.filter(
+        key=key,
+        expires_at__gt=timezone.now()
+    ).values_list(field, flat=True).first()
+
+
+def set_record_data(key: str, ttl: int, data: dict):
+    if data:
+        upsert_record(key, ttl, data=data)
+        return
+    FSMRecord.objects.filter(key=key, state__isnull=True).delete()
+    FSMRecord.objects.filter(key=key).update(data={})
+
+
+@transaction.atomic
+def update_record_data(key: str, ttl: int, data: Mapping[str, Any]) -> dict:
+    """Merge data under a row lock so concurrent workers do not clash.
+
+    A missing row is inserted first, so there is always a row to lock
+    and no worker starts from an empty dict another one already filled.
+    """
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=ttl)
+    FSMRecord.objects.bulk_create(
+        [FSMRecord(key=key, expires_at=expires_at)],
+        ignore_conflicts=True
+    )
+    record = FSMRecord.objects.select_for_update().get(key=key)
+    if record.expires_at <= now:
+        record.state = None
+        record.data = {}
+    record.data.update(data)
+    record.expires_at = expires_at
+    record.save(update_fields=['state', 'data', 'expires_at'])
+    return record.data
+
+
+def delete_expired_records(batch_size: int = FSM_CLEANUP_BATCH_SIZE) -> int:
+    """Delete expired records in batches. Returns the number deleted."""
+    total = 0
+    while True:
+        expired = FSMRecord.objects.filter(
+            expires_at__lte=timezone.now()
+        ).values('pk')[:batch_size]
+        deleted, _ = FSMRecord.objects.filter(pk__in=expired).delete()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+class DjangoStorage(BaseStorage):
+    """FSM storage in the database so any bot worker can continue a flow."""
+
+    def __init__(
+        self,
+        ttl: int = FSM_TTL,
+        key_builder: Optional[KeyBuilder] = None
+    ):
+        self.ttl = ttl
+        self.key_builder = key_builder or DefaultKeyBuilder()
+        self._locks = WeakValueDictionary()
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    async def set_state(self, key: StorageKey, state: StateType = None):
+        state = state.state if isinstance(state, State) else state
+        record_key = self.key_builder.build(key)
+        async with self._lock(record_key):
+            await db_sync_to_async(upsert_record)(
+                record_key, self.ttl, state=state
+            )
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await db_sync_to_async(get_record_field)(
+            self.key_builder.build(key), 'state'
+        )
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]):
+        record_key = self.key_builder.build(key)
+        async with self._lock(record_key):
+            await db_sync_to_async(set_record_data)(
+                record_key, self.ttl, dict(data)
+            )
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        data = await db_sync_to_async(get_record_field)(
+            self.key_builder.build(key), 'data'
+        )
+        return data or {}
+
+    async def update_data(
+        self,
+        key: StorageKey,
+        data: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        record_key = self.key_builder.build(key)
+        async with self._lock(record_key):
+            current_data = await db_sync_to_async(update_record_data)(
+                record_key, self.ttl, data
+            )
+        return current_data.copy()
+
+    async def close(self):
+        pass
+
+
+async def start_fsm_cleanup():
+    """Periodically delete expired FSM records."""
+    while True:
+        try:
+            await db_sync_to_async(delete_expired_records)()
+        except Exception as e:
+            print(f'Ошибка очистки FSM: {e}')
+        await asyncio.sleep(FSM_CLEANUP_PERIOD)
@@ -0,0 +1,193 @@
+import asyncio
+import os
+from concurrent.futures import Executor, Future
+from unittest import mock
+
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from content.models import Category, ContentFile, Path, Topic
+from tg_bot.broadcast import TokenBucket
+from tg_bot.cache import keyboard_cache
+from tg_bot.catalog import aget_catalog, build_snapshot, invalidate_catalog
+from tg_bot.constants import BROADCAST_RATE, ITEMS_PER_PAGE, REMINDER_RATE
+from tg_bot.handlers import aget_3level_or_default, get_content_header
+from tg_bot.keyboards import (
+    get_categories_page,
+    get_content_menu,
+    get_level2_menu,
+    get_level3_menu
+)
+
+
+SNAPSHOT_QUERIES = 7
+BROADCAST_RECIPIENTS = 100_000
+BROADCAST_BUDGET = 60 * 60
+TELEGRAM_RATE_LIMIT = 30
+
+
+class InlineExecutor(Executor):
+    """Run bot DB calls inline so the event loop's connection sees them.
+
+    The ORM is then called from the event loop, which Django only allows
+    with DJANGO_ALLOW_ASYNC_UNSAFE.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+class Level2MenuQueriesTest(TransactionTestCase):
+    """Level 2 pages are built from the catalog snapshot.
+
+    The async code runs on its own connection, so the data is committed
+    and assertNumQueries is entered inside the coroutine.
+    """
+
+    def setUp(self):
+        self.path = Path.objects.create(name='Родителям', slug='parents')
+        self.topic = Topic.objects.create(name='Сон', slug='sleep')
+        self.categories = [
+            Category.objects.create(
+                name=f'Категория {number:02}',
+                slug=f'category-{number}',
+                path=self.path
+            )
+            for number in range(ITEMS_PER_PAGE + 2)
+        ]
+        content_file = ContentFile.objects.create(
+            name='Памятка',
+            file_type=ContentFile.FileType.TEXT,
+            is_active=True
+        )
+        content_file.paths.add(self.path)
+        content_file.categories.add(self.categories[0])
+        content_file.topics.add(self.topic)
+        for patcher in (
+            mock.patch('tg_bot.db.executor', InlineExecutor()),
+            mock.patch.dict(os.environ, {'DJANGO_ALLOW_ASYNC_UNSAFE': '1'}),
+            mock.patch('tg_bot.messages._texts', {}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        invalidate_catalog()
+        keyboard_cache.clear()
+
+    def run_with_queries(self, num: int, coro):
+        async def counted():
+            try:
+                with self.assertNumQueries(num):
+                    return await coro
+            finally:
+                connections['default'].close()
+        return asyncio.run(counted())
+
+    def test_snapshot_queries_do_not_depend_on_categories(self):
+        self.run_with_queries(SNAPSHOT_QUERIES, aget_catalog())
+        Category.objects.create(
+            name='Ещё одна',
+            slug='one-more',
+            path=self.path
+        )
+        invalidate_catalog()
+        self.run_with_queries(SNAPSHOT_QUERIES, aget_catalog())
+
+    def test_level2_pages_use_the_snapshot(self):
+        async def open_pages():
+            first_page = await get_categories_page(self.path.id)
+            await get_level2_menu(self.path.id)
+            await get_level2_menu(self.path.id, page=2)
+            return first_page
+
+        self.run_with_queries(SNAPSHOT_QUERIES, aget_catalog())
+        first_page = self.run_with_queries(0, open_pages())
+        has_topics = {
+            category['id']: category['has_topics']
+            for category in first_page['categories']
+        }
+        self.assertTrue(has_topics[self.categories[0].id])
+        self.assertFalse(has_topics[self.categories[1].id])
+        self.assertEqual(first_page['num_pages'], 2)
+
+    def test_level3_and_content_pages_use_the_snapshot(self):
+        category = self.categories[0]
+
+        async def open_pages():
+            level3_text = await aget_3level_or_default(
+                'level3', category.name
+            )
+            await get_level3_menu(self.path.id, category.id)
+            header = await get_content_header(category.id, self.topic.id)
+            await get_content_menu(self.path.id, category.id, self.topic.id)
+            await get_content_menu(self.path.id, category.id, None)
+            return level3_text, header
+
+        self.run_with_queries(SNAPSHOT_QUERIES, aget_catalog())
+        level3_text, header = self.run_with_queries(0, open_pages())
+        self.assertIn(category.name, level3_text)
+        self.assertIn(category.name, header)
+        self.assertIn(self.topic.name, header)
+
+
+class CatalogVersionTest(TestCase):
+    """Rebuilds keep the version unless the tree changed."""
+
+    def setUp(self):
+        self.path = Path.objects.create(name='Родителям', slug='parents')
+        self.category = Category.objects.create(
+            name='Слух',
+            slug='hearing',
+            path=self.path
+        )
+
+    def test_unchanged_rebuild_keeps_version(self):
+        snapshot = build_snapshot(1)
+        rebuilt = build_snapshot(2, snapshot)
+        self.assertEqual(rebuilt.version, snapshot.version)
+        self.assertEqual(rebuilt.generation, 2)
+
+    def test_change_bumps_version(self):
+        snapshot = build_snapshot(1)
+        self.category.name = 'Речь'
+        self.category.save()
+        rebuilt = build_snapshot(2, snapshot)
+        self.assertNotEqual(rebuilt.version, snapshot.version)
+
+
+class BroadcastThroughputTest(SimpleTestCase):
+    """A 100k broadcast fits in an hour under the rate limit."""
+
+    def test_limiter_rate(self):
+        self.assertLessEqual(
+            BROADCAST_RATE + REMINDER_RATE, TELEGRAM_RATE_LIMIT
+        )
+
+    def test_broadcast_budget(self):
+        """Acquire a token per recipient on a simulated clock.
+
+        Sleeping only advances the clock, so acquire() never suspends and
+        is driven without an event loop. Like a real clock, it advances by
+        at least a microsecond.
+        """
+        clock = [0.0]
+
+        async def sleep(seconds):
+            clock[0] += max(seconds, 1e-6)
+
+        limiter = TokenBucket()
+        with (
+            mock.patch('tg_bot.broadcast.time.monotonic', lambda: clock[0]),
+            mock.patch('tg_bot.broadcast.asyncio.sleep', sleep),
+        ):
+            limiter._updated = clock[0]
+            for _ in range(BROADCAST_RECIPIENTS):
+                with self.assertRaises(StopIteration):
+                    limiter.acquire().send(None)
+        self.assertLess(clock[0], BROADCAST_BUDGET)
+        self.assertAlmostEqual(
+            clock[0],
+            (BROADCAST_RECIPIENTS - limiter.capacity) / BROADCAST_RATE,
+            delta=1
+        )
@@ -1,51 +1,124 @@
+from collections import Counter
 from datetime import timedelta
 
 import asyncio
 from aiogram import Bot
-from asgiref.sync import sync_to_async
-from django.core.exceptions import ObjectDoesNotExist
+from aiogram.types import Message
+from django.db.models import Func, IntegerField, Value
+from django.db.models.functions import Mod, TruncDate
 from django.utils import timezone
 import schedule
 
 from tg_bot import keyboards as kb
+from tg_bot.broadcast import (
+    BLOCKED,
+    deactivate_bot_users,
+    reminder_limiter,
+    send_with_retry
+)
 from tg_bot.constants import (
+    BROADCAST_CHUNK_SIZE,
     DEFAULT_REMINDER_MESSAGE,
     INACTIVE_DAYS_FOR_MESSAGE,
     NOTIFICATION_TIME
 )
-from tg_bot.models import BotMessage
+from tg_bot.db import db_sync_to_async
+from tg_bot.messages import aget_bot_message
 from users.models import BotUser
 
 
-async def send_reminders(bot: Bot):
+def get_sent_file_ids(message: Message) -> tuple[str, str] | None:
+    """Telegram file_id and file_unique_id of the media in a message."""
+    if message.photo:
+        media = message.photo[-1]
+    else:
+        media = (
+            message.video
+            or message.animation
+            or message.audio
+            or message.voice
+            or message.document
+        )
+    if media is None:
+        return None
+    return media.file_id, media.file_unique_id
+
+
+class DaysSince(Func):
+    """Whole days from a datetime column to a day, in the local time zone.
+
+    The column is truncated with TruncDate, i.e. in TIME_ZONE, so reminder
+    days follow the same calendar as timezone.localdate().
+    """
+
+    arg_joiner = ' - '
+    template = '(%(expressions)s)'
+    output_field = IntegerField()
+
+    def __init__(self, expression, day, **extra):
+        super().__init__(Value(day), TruncDate(expression), **extra)
+
+
+def get_reminder_recipients(after_id: int, chunk_size: int) -> list[int]:
+    """Telegram ids of the next chunk of users due a reminder.
+
+    Users inactive for a multiple of INACTIVE_DAYS_FOR_MESSAGE days are
+    selected in SQL over the (is_active, last_active) index.
+    """
+    return list(
+        BotUser.objects.filter(
+            is_active=True,
+            last_active__lte=(
+                timezone.now() - timedelta(days=INACTIVE_DAYS_FOR_MESSAGE)
+            ),
+            id__gt=after_id
+        ).annotate(
+            days_inactive=Mod(
+                DaysSince('last_active', timezone.localdate()),
+                INACTIVE_DAYS_FOR_MESSAGE
+            )
+        ).filter(
+            days_inactive=0
+        ).order_by('id').values_list('id', 'telegram_id')[:chunk_size]
+    )
+
+
+async def send_reminders(bot: Bot, chunk_size: int = BROADCAST_CHUNK_SIZE):
     """The function of sending messages to inactive users."""
     try:
-        inactive_days_ago = (
-            timezone.now() - timedelta(days=INACTIVE_DAYS_FOR_MESSAGE)
-        )
-        inactive_users = await sync_to_async(list)(
-            BotUser.objects.filter(
-                last_active__lte=inactive_days_ago,
-                is_active=True)
+        message_text = await aget_bot_message(
+            'reminder_message',
+            DEFAULT_REMINDER_MESSAGE
         )
-
-        try:
-            reminder_message = await BotMessage.objects.aget(
-                key='reminder_message'
+        reply_markup = await kb.get_level1_menu()
+        stats = Counter()
+        after_id = 0
+        while True:
+            recipients = await db_sync_to_async(get_reminder_recipients)(
+                after_id, chunk_size
             )
-            message_text = reminder_message.text
-        except ObjectDoesNotExist:
-            message_text = DEFAULT_REMINDER_MESSAGE
-
-        for user in inactive_users:
-            today = timezone.now().date()
-            days_inactive = (today - user.last_active.date()).days
-            if days_inactive % INACTIVE_DAYS_FOR_MESSAGE == 0:
-                await bot.send_message(
-                    chat_id=user.telegram_id,
+            if not recipients:
+                break
+            after_id = recipients[-1][0]
+            results = await asyncio.gather(*(
+                send_with_retry(
+                    bot,
+                    reminder_limiter,
+                    telegram_id,
                     text=message_text,
-                    reply_markup=await kb.get_level1_menu()
+                    reply_markup=reply_markup
                 )
+                for _, telegram_id in recipients
+            ))
+            stats.update(results)
+            blocked = [
+                telegram_id
+                for (_, telegram_id), result in zip(recipients, results)
+                if result == BLOCKED
+            ]
+            if blocked:
+                await db_sync_to_async(deactivate_bot_users)(blocked)
+        print(f'Напоминания отправлены: {dict(stats)}')
 
     except Exception as e:
         print(f'Ошибка при отправке уведомлений: {e}')
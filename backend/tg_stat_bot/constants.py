@@ -1,5 +1,13 @@
 TOP_CONTENT_NUMBER = 5
 STATS_MESSAGE_TIME = '10:00'
+ACTIVE_USERS_WINDOWS = {1: 'dau', 7: 'wau', 30: 'mau'}
+METRICS_SNAPSHOT_KEY = 'metrics'
+TIMESERIES_METRICS = ['views', 'active_users', 'new_users']
+TIMESERIES_GRANULARITIES = ['day', 'week', 'month']
+TIMESERIES_DEFAULT_DAYS = 30
+TIMESERIES_MAX_DAYS = 3 * 366
+# Share of the TTL after which the snapshot is refreshed in the background.
+STATS_REFRESH_AFTER = 0.8
 START_MESSAGE = (
     f'Вы подписаны на статистику. Отчёт '
     f'будет приходить каждый понедельник в {STATS_MESSAGE_TIME}(UTC+3 МСК)'
@@ -0,0 +1,104 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from content.models import ContentFile, ContentViewStat
+from users.models import BotUser
+
+
+BENCH_ROWS = 100000
+BENCH_BATCH_SIZE = 500
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_relation_sizes() -> dict:
+    """Sizes of the views table and each of its indexes, partitions summed."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT %s, sum(pg_relation_size(relid)) '
+            'FROM pg_partition_tree(%s::regclass) '
+            'UNION ALL '
+            'SELECT i.indexrelid::regclass::text, ('
+            'SELECT sum(pg_relation_size(relid)) '
+            'FROM pg_partition_tree(i.indexrelid)) '
+            'FROM pg_index i WHERE i.indrelid = %s::regclass',
+            [
+                ContentViewStat._meta.db_table,
+                ContentViewStat._meta.db_table,
+                ContentViewStat._meta.db_table
+            ]
+        )
+        return {name: int(size or 0) for name, size in cursor.fetchall()}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure insert cost and table and index growth of content views; '
+        'the inserted rows are rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=BENCH_ROWS,
+            help='Number of views to insert',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BENCH_BATCH_SIZE,
+            help='Views per bulk insert, as in the bot view buffer',
+        )
+
+    def handle(self, *args, **options):
+        rows = max(1, options['rows'])
+        batch_size = max(1, options['batch_size'])
+        user_ids = list(BotUser.objects.values_list('id', flat=True)[:1000])
+        content_ids = list(ContentFile.objects.values_list('id', flat=True))
+        if not user_ids or not content_ids:
+            raise CommandError('Need at least one bot user and one file')
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                before = get_relation_sizes()
+                latencies = []
+                for offset in range(0, rows, batch_size):
+                    views = [
+                        ContentViewStat(
+                            user_id=random.choice(user_ids),
+                            content_file_id=random.choice(content_ids),
+                            viewed_at=now - timedelta(
+                                seconds=rows - offset - i
+                            )
+                        )
+                        for i in range(min(batch_size, rows - offset))
+                    ]
+                    started = time.perf_counter()
+                    ContentViewStat.objects.bulk_create(views)
+                    latencies.append(time.perf_counter() - started)
+                after = get_relation_sizes()
+                raise Rollback
+        except Rollback:
+            pass
+        elapsed = sum(latencies)
+        latencies.sort()
+        self.stdout.write(
+            f'Inserted {rows} views in batches of {batch_size}: '
+            f'{rows / elapsed:.0f} rows/s, '
+            f'p50 batch {latencies[len(latencies) // 2] * 1000:.1f} ms, '
+            f'max batch {latencies[-1] * 1000:.1f} ms'
+        )
+        for name, size in after.items():
+            growth = size - before.get(name, 0)
+            self.stdout.write(
+                f'{name:<40} {size / 1024:>10.0f} KB, '
+                f'+{growth / rows:.1f} bytes per view'
+            )
@@ -0,0 +1,69 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from content.models import ContentViewStat
+from tg_stat_bot.utils import (
+    count_unique_viewers,
+    get_active_users_estimate,
+    get_active_users_exact,
+    get_top_content_last_week
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare HyperLogLog estimates of unique users with exact counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Window for unique viewers of the top content',
+        )
+
+    def report(self, name, exact, estimate, elapsed=None):
+        error = abs(estimate - exact) / exact * 100 if exact else 0
+        line = (
+            f'{name:>24}: exact {exact:>8}, estimate {estimate:>8}, '
+            f'error {error:5.2f}%'
+        )
+        if elapsed is not None:
+            line += f', {elapsed * 1000:.2f} ms'
+        self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        exact = get_active_users_exact()
+        exact_elapsed = time.perf_counter() - started
+        started = time.perf_counter()
+        estimate = get_active_users_estimate()
+        estimate_elapsed = time.perf_counter() - started
+        for name in exact:
+            self.report(name, exact[name], estimate[name])
+        self.stdout.write(
+            f'Exact: {exact_elapsed * 1000:.2f} ms, '
+            f'sketches: {estimate_elapsed * 1000:.2f} ms'
+        )
+
+        start = timezone.localdate() - timedelta(
+            days=max(1, options['days']) - 1
+        )
+        viewers = dict(ContentViewStat.objects.filter(
+            viewed_at__date__gte=start
+        ).values('content_file_id').annotate(
+            users=Count('user', distinct=True)
+        ).values_list('content_file_id', 'users'))
+        for item in get_top_content_last_week():
+            content_id = item['content_file_id']
+            started = time.perf_counter()
+            estimate = count_unique_viewers(content_id, start)
+            self.report(
+                item['content_file__name'][:24],
+                viewers.get(content_id, 0),
+                estimate,
+                time.perf_counter() - started
+            )
@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from content.stats import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily statistics rollups from raw views and users'
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            '--since',
+            type=str,
+            help='First day to rebuild, YYYY-MM-DD (default: everything)',
+        )
+        group.add_argument(
+            '--days',
+            type=int,
+            help='Rebuild only the last N days',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD')
+        elif options['days']:
+            since = timezone.localdate() - timedelta(
+                days=max(1, options['days']) - 1
+            )
+        counts = rebuild_rollups(since)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rollups rebuilt since {since or "the beginning"}: '
+            + ', '.join(f'{name} {rows}' for name, rows in counts.items())
+        ))
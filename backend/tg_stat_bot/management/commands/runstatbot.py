@@ -1,9 +1,11 @@
 import asyncio
+import logging
 
 from aiogram import Bot, Dispatcher
 from django.conf import settings
 from django.core.management.base import BaseCommand
 
+from tg_bot.db import start_pool_stats_logging
 from tg_stat_bot.handlers import router
 from tg_stat_bot.middleware import StatBotUserMiddleware
 from tg_stat_bot.utils import start_scheduler
@@ -20,6 +22,7 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        logging.basicConfig(level=logging.INFO)
 
         token = settings.TELEGRAM_ADMIN_BOT_TOKEN
 
@@ -29,7 +32,7 @@ class Command(BaseCommand):
                     '❌ Bot token not found. '
                     'Enter token using one of the methods:\n'
                     '   - Command argument --token <token>\n'
-                    '   - Via enviromental variable TELEGRAM_BOT_TOKEN'
+                    '   - Via environment variable TELEGRAM_BOT_TOKEN'
                 )
             )
             return
@@ -51,5 +54,6 @@ class Command(BaseCommand):
         dp.include_router(router)
         dp.update.middleware(StatBotUserMiddleware())
         asyncio.create_task(start_scheduler(bot))
+        asyncio.create_task(start_pool_stats_logging())
 
         await dp.start_polling(bot)
@@ -0,0 +1,69 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from content.partitions import (
+    create_view_partitions,
+    detach_view_partitions,
+    get_view_partitions
+)
+
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+class Command(BaseCommand):
+    help = 'Create, detach and list the monthly partitions of content views'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--create',
+            action='store_true',
+            help='Create missing partitions up to --ahead months',
+        )
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=settings.VIEW_PARTITIONS_AHEAD,
+            help='Months to create in advance',
+        )
+        parser.add_argument(
+            '--detach-before',
+            type=str,
+            help='Detach partitions of months before YYYY-MM',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop detached partitions instead of keeping them',
+        )
+
+    def handle(self, *args, **options):
+        if options['create']:
+            created = create_view_partitions(max(0, options['ahead']))
+            self.stdout.write(
+                f'Created: {", ".join(created) or "nothing"}'
+            )
+        if options['detach_before']:
+            try:
+                before = date.fromisoformat(f'{options["detach_before"]}-01')
+            except ValueError:
+                raise CommandError('--detach-before must be YYYY-MM')
+            detached = detach_view_partitions(before, options['drop'])
+            action = 'Dropped' if options['drop'] else 'Detached'
+            self.stdout.write(
+                f'{action}: {", ".join(detached) or "nothing"}'
+            )
+        for partition in get_view_partitions():
+            self.stdout.write(
+                f'{partition["name"]:<36} {partition["rows"]:>12} rows '
+                f'{format_size(partition["table_size"]):>10} data '
+                f'{format_size(partition["index_size"]):>10} indexes  '
+                f'{partition["bound"]}'
+            )
@@ -1,7 +1,7 @@
 from aiogram import BaseMiddleware
-from asgiref.sync import sync_to_async
 from aiogram.types import Update
 
+from tg_bot.db import db_sync_to_async
 from users.models import StatBotUser
 
 
@@ -18,7 +18,7 @@ class StatBotUserMiddleware(BaseMiddleware):
             await self.create_or_update_user(user)
         return await handler(event, data)
 
-    @sync_to_async
+    @db_sync_to_async
     def create_or_update_user(self, tg_user):
         """Creates or updates a user."""
         try:
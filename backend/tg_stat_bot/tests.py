@@ -0,0 +1,90 @@
+from datetime import date
+
+from django.test import TestCase
+
+from content.models import ContentFile, DailyActiveUser, DailyContentUser
+from tg_stat_bot.utils import get_timeseries
+from users.models import BotUser
+
+
+class ActiveUsersTimeseriesTest(TestCase):
+    """Active users per week and month are distinct users, not day sums."""
+
+    def setUp(self):
+        users = [
+            BotUser.objects.create(telegram_id=number)
+            for number in range(3)
+        ]
+        DailyActiveUser.objects.bulk_create([
+            DailyActiveUser(day=date(2026, 6, 1), user=users[0]),
+            DailyActiveUser(day=date(2026, 6, 1), user=users[1]),
+            DailyActiveUser(day=date(2026, 6, 3), user=users[0]),
+            DailyActiveUser(day=date(2026, 6, 3), user=users[2]),
+            DailyActiveUser(day=date(2026, 6, 10), user=users[0]),
+            DailyActiveUser(day=date(2026, 7, 1), user=users[1]),
+        ])
+        self.content_file, other_file = [
+            ContentFile.objects.create(
+                name=name,
+                file_type=ContentFile.FileType.TEXT
+            )
+            for name in ('Памятка', 'Чек-лист')
+        ]
+        DailyContentUser.objects.bulk_create([
+            DailyContentUser(
+                day=date(2026, 6, 1),
+                content_file=self.content_file,
+                user=users[0]
+            ),
+            DailyContentUser(
+                day=date(2026, 6, 3),
+                content_file=self.content_file,
+                user=users[0]
+            ),
+            DailyContentUser(
+                day=date(2026, 6, 3),
+                content_file=self.content_file,
+                user=users[1]
+            ),
+            DailyContentUser(
+                day=date(2026, 6, 1),
+                content_file=other_file,
+                user=users[2]
+            ),
+        ])
+
+    def get_values(self, granularity, start, end, content_id=None):
+        with self.assertNumQueries(1):
+            points = get_timeseries(
+                'active_users', start, end, granularity, content_id
+            )
+        return {point['date']: point['value'] for point in points}
+
+    def test_week(self):
+        self.assertEqual(
+            self.get_values('week', date(2026, 6, 1), date(2026, 7, 5)),
+            {
+                date(2026, 6, 1): 3,
+                date(2026, 6, 8): 1,
+                date(2026, 6, 15): 0,
+                date(2026, 6, 22): 0,
+                date(2026, 6, 29): 1,
+            }
+        )
+
+    def test_month(self):
+        self.assertEqual(
+            self.get_values('month', date(2026, 6, 1), date(2026, 7, 31)),
+            {date(2026, 6, 1): 3, date(2026, 7, 1): 1}
+        )
+
+    def test_file_week(self):
+        self.assertEqual(
+            self.get_values(
+                'week',
+                date(2026, 6, 1),
+                date(2026, 6, 14),
+                self.content_file.id
+            ),
+            {date(2026, 6, 1): 2, date(2026, 6, 8): 0}
+        )
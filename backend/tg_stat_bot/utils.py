@@ -1,57 +1,133 @@
-from datetime import timedelta
+import hashlib
+import json
+import threading
+from datetime import date, timedelta
 
 import asyncio
 import schedule
 from aiogram import Bot
-from asgiref.sync import sync_to_async
-from django.db.models import Count, Q
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
 from django.utils import timezone
 
-from content.models import ContentViewStat
-from tg_stat_bot.constants import STATS_MESSAGE_TIME, TOP_CONTENT_NUMBER
-from users.models import BotUser, StatBotUser
+from content.hll import HyperLogLog
+from content.models import (
+    DailyActiveUser,
+    DailyContentSketch,
+    DailyContentUser,
+    DailyContentViews,
+    DailyNewUsers,
+    DailyUserSketch,
+    StatisticsSnapshot
+)
+from tg_bot.db import db_sync_to_async
+from tg_stat_bot.constants import (
+    ACTIVE_USERS_WINDOWS,
+    METRICS_SNAPSHOT_KEY,
+    STATS_MESSAGE_TIME,
+    STATS_REFRESH_AFTER,
+    TOP_CONTENT_NUMBER
+)
+from users.models import StatBotUser
+
+
+def get_days_window(days: int):
+    """First day of a window of days calendar days ending today."""
+    return timezone.localdate() - timedelta(days=days - 1)
 
 
 def get_new_users_last_week():
-    last_week = timezone.now() - timedelta(days=7)
-    new_users_count = BotUser.objects.filter(
-        created_at__gte=last_week
-    ).count()
-    return new_users_count
+    return DailyNewUsers.objects.filter(
+        day__gte=get_days_window(7)
+    ).aggregate(total=Sum('users'))['total'] or 0
 
 
 def get_top_content_last_week(limit=TOP_CONTENT_NUMBER):
-    last_week = timezone.now() - timedelta(days=7)
-    top_content = ContentViewStat.objects.filter(
-        viewed_at__gte=last_week
+    top_content = DailyContentViews.objects.filter(
+        day__gte=get_days_window(7)
     ).values(
         'content_file__name',
         'content_file_id'
     ).annotate(
-        view_count=Count('id')
+        view_count=Sum('views')
     ).order_by('-view_count')[:limit]
     return top_content
 
 
-def get_all_metrics():
-    now = timezone.now()
-    content_metrics = ContentViewStat.objects.aggregate(
+def merge_daily_sketches(model, **filters) -> HyperLogLog:
+    sketch = HyperLogLog()
+    for data in model.objects.filter(**filters).values_list(
+        'sketch', flat=True
+    ):
+        sketch.merge(HyperLogLog(data))
+    return sketch
+
+
+def count_unique_users(start: date, end: date = None) -> int:
+    """Estimated number of users who viewed content from start to end."""
+    return merge_daily_sketches(
+        DailyUserSketch,
+        day__range=(start, end or timezone.localdate())
+    ).count()
+
+
+def count_unique_viewers(content_id: int, start: date, end: date = None):
+    """Estimated number of users who viewed a file from start to end."""
+    return merge_daily_sketches(
+        DailyContentSketch,
+        content_file_id=content_id,
+        day__range=(start, end or timezone.localdate())
+    ).count()
+
+
+def get_active_users_exact():
+    """Exact DAU/WAU/MAU over the last 1/7/30 days."""
+    return DailyActiveUser.objects.filter(
+        day__gte=get_days_window(30)
+    ).aggregate(
         dau=Count(
             'user',
-            filter=Q(viewed_at__gte=now - timedelta(days=1)),
+            filter=Q(day__gte=get_days_window(1)),
             distinct=True
         ),
         wau=Count(
             'user',
-            filter=Q(viewed_at__gte=now - timedelta(days=7)),
-            distinct=True
-        ),
-        mau=Count(
-            'user',
-            filter=Q(viewed_at__gte=now - timedelta(days=30)),
+            filter=Q(day__gte=get_days_window(7)),
             distinct=True
         ),
+        mau=Count('user', distinct=True),
     )
+
+
+def get_active_users_estimate():
+    """DAU/WAU/MAU estimated by merging at most 30 daily sketches."""
+    sketches = dict(DailyUserSketch.objects.filter(
+        day__gte=get_days_window(30)
+    ).values_list('day', 'sketch'))
+    today = timezone.localdate()
+    merged = HyperLogLog()
+    metrics = {}
+    for days in range(1, 31):
+        data = sketches.get(today - timedelta(days=days - 1))
+        if data is not None:
+            merged.merge(HyperLogLog(data))
+        if days in ACTIVE_USERS_WINDOWS:
+            metrics[ACTIVE_USERS_WINDOWS[days]] = merged.count()
+    return metrics
+
+
+def get_all_metrics(exact=False):
+    """DAU/WAU/MAU over the last 1/7/30 days and weekly figures.
+
+    Active users are estimated from daily HyperLogLog sketches (about
+    1.6% standard error); exact=True counts them from the rollups.
+    """
+    if exact:
+        content_metrics = get_active_users_exact()
+    else:
+        content_metrics = get_active_users_estimate()
     new_users = get_new_users_last_week()
     top_content = get_top_content_last_week()
     return {
@@ -63,10 +139,181 @@ def get_all_metrics():
     }
 
 
+TRUNCATE = {'week': TruncWeek, 'month': TruncMonth}
+
+
+def get_period_start(day: date, granularity: str) -> date:
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def get_periods(start: date, end: date, granularity: str):
+    """Start days of all periods from start to end."""
+    period = get_period_start(start, granularity)
+    while period <= end:
+        yield period
+        if granularity == 'week':
+            period += timedelta(days=7)
+        elif granularity == 'month':
+            period = (period.replace(day=28) + timedelta(days=4)).replace(
+                day=1
+            )
+        else:
+            period += timedelta(days=1)
+
+
+def get_timeseries(
+    metric: str,
+    start: date,
+    end: date,
+    granularity: str = 'day',
+    content_id: int = None
+) -> list[dict]:
+    """Values of a metric per period, periods without data filled with 0.
+
+    One grouped query over the daily rollups, so active users are exact
+    at every granularity: distinct users per period, not a sum of days.
+    """
+    if metric == 'views':
+        queryset = DailyContentViews.objects.filter(day__range=(start, end))
+        value = Sum('views')
+    elif metric == 'active_users':
+        if content_id is None:
+            queryset = DailyActiveUser.objects.all()
+        else:
+            queryset = DailyContentUser.objects.all()
+        queryset = queryset.filter(day__range=(start, end))
+        value = Count('user', distinct=True)
+    else:
+        queryset = DailyNewUsers.objects.filter(day__range=(start, end))
+        value = Sum('users')
+    if content_id is not None:
+        queryset = queryset.filter(content_file_id=content_id)
+    if granularity in TRUNCATE:
+        queryset = queryset.annotate(period=TRUNCATE[granularity]('day'))
+    else:
+        queryset = queryset.annotate(period=F('day'))
+    values = dict(queryset.values('period').annotate(
+        value=value
+    ).values_list('period', 'value'))
+    return [
+        {'date': period, 'value': values.get(period) or 0}
+        for period in get_periods(start, end, granularity)
+    ]
+
+
+class MetricsSnapshot:
+    """get_all_metrics() cached for ttl seconds and shared via the DB.
+
+    A snapshot older than refresh_after * ttl is still served while a
+    background thread recomputes it (stale-while-revalidate); only a
+    missing or expired one is computed in the caller. Row locking keeps
+    processes from recomputing it at the same time.
+    """
+
+    def __init__(
+        self,
+        key: str = METRICS_SNAPSHOT_KEY,
+        ttl: int = None,
+        refresh_after: float = STATS_REFRESH_AFTER
+    ):
+        self.key = key
+        self.ttl = timedelta(
+            seconds=settings.STATS_CACHE_TTL if ttl is None else ttl
+        )
+        self.refresh_after = self.ttl * refresh_after
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    @staticmethod
+    def make_etag(data) -> str:
+        payload = json.dumps(data, sort_keys=True, default=str).encode()
+        return f'"{hashlib.md5(payload).hexdigest()}"'
+
+    def _age(self, snapshot):
+        return timezone.now() - snapshot[1]
+
+    def _store(self, row: StatisticsSnapshot):
+        self._snapshot = (row.data, row.computed_at, self.make_etag(row.data))
+        return self._snapshot
+
+    @transaction.atomic
+    def compute(self) -> StatisticsSnapshot | None:
+        """Recompute and save the snapshot.
+
+        Returns None when another process is already recomputing it.
+        """
+        row = StatisticsSnapshot.objects.select_for_update(
+            skip_locked=True
+        ).filter(key=self.key).first()
+        if row is None:
+            if StatisticsSnapshot.objects.filter(key=self.key).exists():
+                return None
+        elif timezone.now() - row.computed_at < self.refresh_after:
+            return row
+        row, = StatisticsSnapshot.objects.bulk_create(
+            [StatisticsSnapshot(
+                key=self.key,
+                data=get_all_metrics(),
+                computed_at=timezone.now()
+            )],
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['data', 'computed_at']
+        )
+        return row
+
+    def _refresh(self):
+        try:
+            row = self.compute()
+            if row is not None:
+                self._store(row)
+        except Exception as e:
+            print(f'Ошибка обновления статистики: {e}')
+        finally:
+            self._refreshing = False
+            connection.close()
+
+    def get(self) -> tuple:
+        """Return (metrics, computed_at, etag)."""
+        snapshot = self._snapshot
+        if snapshot is None or self._age(snapshot) >= self.ttl:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or self._age(snapshot) >= self.ttl:
+                    row = StatisticsSnapshot.objects.filter(
+                        key=self.key
+                    ).first()
+                    if row is not None:
+                        snapshot = self._store(row)
+                if snapshot is None or self._age(snapshot) >= self.ttl:
+                    row = self.compute()
+                    if row is not None:
+                        snapshot = self._store(row)
+                    elif snapshot is None:
+                        data = get_all_metrics()
+                        snapshot = (
+                            data, timezone.now(), self.make_etag(data)
+                        )
+        if self._age(snapshot) >= self.refresh_after:
+            with self._lock:
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(target=self._refresh, daemon=True).start()
+        return snapshot
+
+
+metrics_snapshot = MetricsSnapshot()
+
+
 async def send_stats(bot: Bot):
     try:
-        users = await sync_to_async(list)(StatBotUser.objects.all())
-        metrics = await sync_to_async(get_all_metrics)()
+        users = await db_sync_to_async(list)(StatBotUser.objects.all())
+        metrics = await db_sync_to_async(get_all_metrics)()
         message_text = (
             '📊 Статистика активных пользователей:\n'
             f'👥 DAU (за сутки): {metrics["dau"]}\n'
@@ -102,7 +349,7 @@ async def send_stats(bot: Bot):
 
 async def send_start_stats():
     try:
-        metrics = await sync_to_async(get_all_metrics)()
+        metrics, _, _ = await db_sync_to_async(metrics_snapshot.get)()
         message_text = (
             '📊 Статистика активных пользователей:\n'
             f'👥 DAU (за сутки): {metrics["dau"]}\n'
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_statbotuser'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='botuser',
+            index=models.Index(fields=['is_active', 'last_active'], name='bot_user_activity_idx'),
+        ),
+    ]
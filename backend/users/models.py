@@ -50,6 +50,12 @@ class BotUser(models.Model):
     class Meta:
         verbose_name = 'bot user'
         verbose_name_plural = 'Bot users'
+        indexes = [
+            models.Index(
+                fields=['is_active', 'last_active'],
+                name='bot_user_activity_idx'
+            ),
+        ]
 
     def __str__(self):
         if self.username: